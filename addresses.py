@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Address normalization and building IDs for cross-run de-duplication
+import argparse
+import csv
+import glob
+import hashlib
+import random
+import re
+import time
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+NOT_FOUND = "Not found"
+
+# Two street names in the same block are the same street at or above this similarity (0-1).
+# Only the name is compared this way; directions and numbered streets must match exactly.
+MATCH_THRESHOLD = 0.85
+
+STREET_TYPES = {
+    'st': 'street', 'str': 'street', 'ave': 'avenue', 'av': 'avenue', 'avn': 'avenue', 'blvd': 'boulevard',
+    'rd': 'road', 'dr': 'drive', 'pl': 'place', 'ln': 'lane', 'ct': 'court', 'pkwy': 'parkway',
+    'hwy': 'highway', 'sq': 'square', 'ter': 'terrace', 'terr': 'terrace', 'cir': 'circle', 'plz': 'plaza',
+    'expy': 'expressway', 'tpke': 'turnpike', 'aly': 'alley', 'bldg': 'building',
+}
+DIRECTIONS = {
+    'n': 'north', 's': 'south', 'e': 'east', 'w': 'west',
+    'ne': 'northeast', 'nw': 'northwest', 'se': 'southeast', 'sw': 'southwest',
+}
+
+_ZIP = re.compile(r'\b(\d{5})(?:-\d{4})?\s*$')
+_STATE = re.compile(r'\b([a-z]{2})\s*$')
+# "Apt 4B", "Unit 12", "Suite 300", "Fl 2", "#5C" - stripped, a building has many units
+_UNIT = re.compile(r'(?:\b(?:apt|apartment|unit|suite|ste|fl|floor|rm|room)\b\.?|#)\s*#?\s*([\w-]*)')
+_HOUSE_NUMBER = re.compile(r'^(\d+[a-z]?)(?:\s*-\s*\d+[a-z]?)?\s+')
+_PUNCTUATION = re.compile(r"[^\w\s,#-]")
+_SPACES = re.compile(r'\s+')
+
+_DIRECTION_WORDS = frozenset(DIRECTIONS.values())
+
+Address = namedtuple('Address', ['number', 'street', 'unit', 'city', 'state', 'zip'])
+
+
+def _expand(street):
+    """'W 42nd St' -> 'west 42nd street'; 'St' is 'saint' anywhere but the end ('St Marks Pl')"""
+    tokens = street.split()
+    expanded = []
+    for i, token in enumerate(tokens):
+        last = i == len(tokens) - 1
+        if token in DIRECTIONS and len(tokens) > 1 and (i == 0 or last):
+            expanded.append(DIRECTIONS[token])
+        elif token == 'st' and not last:
+            expanded.append('saint')
+        else:
+            expanded.append(STREET_TYPES.get(token, token))
+    return " ".join(expanded)
+
+
+def parse(text):
+    """Split a card's free-text address into normalized parts, or None when there is nothing to parse"""
+    if not text or text == NOT_FOUND:
+        return None
+    text = _SPACES.sub(' ', _PUNCTUATION.sub(' ', text.lower())).strip(' ,')
+    zip_code = state = None
+    zip_match = _ZIP.search(text)
+    if zip_match:
+        zip_code = zip_match.group(1)
+        text = text[:zip_match.start()].strip(' ,')
+    parts = [part.strip() for part in text.split(',') if part.strip()]
+    if not parts:
+        return None
+    if len(parts) > 1:
+        state_match = _STATE.search(parts[-1])
+        if state_match:
+            state = state_match.group(1)
+            parts[-1] = parts[-1][:state_match.start()].strip()
+            if not parts[-1]:
+                parts.pop()
+    street_line = parts[0]
+    unit_match = _UNIT.search(street_line)
+    unit = None
+    if unit_match:
+        unit = unit_match.group(1) or None
+        street_line = (street_line[:unit_match.start()] + street_line[unit_match.end():]).strip()
+    # A unit can also sit in its own comma part ("229 President St, Apt 3, Brooklyn")
+    rest = [part for part in parts[1:] if not _UNIT.fullmatch(part)]
+    number = None
+    number_match = _HOUSE_NUMBER.match(street_line)
+    if number_match:
+        number = number_match.group(1)
+        street_line = street_line[number_match.end():]
+    street = _expand(street_line.replace('-', ' ').replace('#', ' '))
+    city = rest[0] if rest else None
+    return Address(number, _SPACES.sub(' ', street).strip(), unit, city, state, zip_code)
+
+
+def normalize(text):
+    """Canonical single-line form: '229 president street, brooklyn, ny 11215' (unit dropped)"""
+    address = parse(text)
+    if address is None:
+        return None
+    line = " ".join(part for part in (address.number, address.street) if part)
+    region = " ".join(part for part in (address.state, address.zip) if part)
+    return ", ".join(part for part in (line, address.city, region) if part)
+
+
+def block_key(address):
+    """Candidates for the same building share this: ZIP (or city) + house number.
+
+    None when the address has no house number or nowhere to place it - such listings
+    are never merged on their address alone.
+    """
+    if address is None or not address.number or not address.street:
+        return None
+    area = address.zip or address.city
+    return f"{area}|{address.number}" if area else None
+
+
+def building_id(block, street):
+    return "b" + hashlib.sha1(f"{block}|{street}".encode('utf-8')).hexdigest()[:12]
+
+
+def _street_parts(street):
+    """'west 42nd street' -> (('west', '42nd'), 'street'): the exact tokens and the name to fuzzy-match"""
+    exact = []
+    name = []
+    for token in street.split():
+        if token in _DIRECTION_WORDS or any(char.isdigit() for char in token):
+            exact.append(token)
+        else:
+            name.append(token)
+    return tuple(exact), " ".join(name)
+
+
+def similar(a, b):
+    """Same street, allowing for typos in its name but not in its direction or number ('E 10th' != 'W 10th')"""
+    if a == b:
+        return True
+    exact_a, a = _street_parts(a)
+    exact_b, b = _street_parts(b)
+    if exact_a != exact_b:
+        return False
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    # The quick ratios are upper bounds on ratio(), so most non-matches stop early
+    return (matcher.real_quick_ratio() >= MATCH_THRESHOLD and matcher.quick_ratio() >= MATCH_THRESHOLD
+            and matcher.ratio() >= MATCH_THRESHOLD)
+
+
+class BuildingIndex:
+    """Known buildings grouped by block_key, so each address is only compared with the handful
+    of buildings at the same house number in the same ZIP - near-linear rather than all pairs"""
+
+    def __init__(self, buildings=()):
+        self.blocks = {}    # block -> {street spelling: building id}
+        self.added = []     # (building id, block, street, address) created since load
+        for block, street, bid in buildings:
+            self.blocks.setdefault(block, {})[street] = bid
+
+    def __len__(self):
+        return sum(len(candidates) for candidates in self.blocks.values())
+
+    def assign(self, text):
+        """Building ID for a free-text address (the same for every spelling of it), or None"""
+        return self.locate(text)[0]
+
+    def locate(self, text):
+        """(building ID or None, unit or None) for a free-text address"""
+        address = parse(text)
+        block = block_key(address)
+        if block is None:
+            return None, address.unit if address else None
+        candidates = self.blocks.setdefault(block, {})
+        bid = candidates.get(address.street)
+        if bid is not None:
+            return bid, address.unit
+        for street, bid in list(candidates.items()):
+            if similar(street, address.street):
+                # Remember this spelling so it is an exact hit next time
+                candidates[address.street] = bid
+                return bid, address.unit
+        bid = building_id(block, address.street)
+        candidates[address.street] = bid
+        self.added.append((bid, block, address.street, normalize(text)))
+        return bid, address.unit
+
+
+def dedupe_key(prop, unit=None):
+    """What makes two listings the same: building and unit, else the listing URL (None = never merged).
+
+    Different units of one building are different listings.
+    """
+    if prop.get('Building ID'):
+        return prop['Building ID'], unit
+    url = prop.get('URL')
+    return url if url and url != NOT_FOUND else None
+
+
+def tag(prop, index):
+    """Set a listing's 'Building ID' (when it has an Address) and return its dedupe_key"""
+    unit = None
+    if 'Address' in prop:
+        prop['Building ID'], unit = index.locate(prop['Address'])
+    return dedupe_key(prop, unit)
+
+
+def dedupe(properties, index=None, seen=None):
+    """Tag each listing with its 'Building ID' and keep the first listing per building and unit (or URL).
+
+    Pass the same `seen` set for every page of a run to de-duplicate across pages.
+    Returns (kept, duplicates removed).
+    """
+    index = index if index is not None else BuildingIndex()
+    seen = seen if seen is not None else set()
+    kept = []
+    for prop in properties:
+        key = tag(prop, index)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(prop)
+    return kept, len(properties) - len(kept)
+
+
+def _variants(rng, number, street, city, zip_code):
+    """A few ways the same building gets written on different cards"""
+    abbreviated = street.replace('Street', 'St').replace('Avenue', 'Ave').replace('West ', 'W ')
+    # A letter dropped from the name (a typo in '42nd' or 'W' is a different street)
+    words = abbreviated.split()
+    longest = max(range(len(words)), key=lambda i: len(words[i]) if words[i].isalpha() else 0)
+    words[longest] = words[longest][:2] + words[longest][3:]
+    typo = " ".join(words)
+    return [
+        f"{number} {street}, {city}, NY {zip_code}",
+        f"{number} {abbreviated}, {city}, NY {zip_code}",
+        f"{number} {abbreviated} Apt {rng.randint(1, 20)}{rng.choice('ABCD')}, {city}, NY {zip_code}",
+        f"{number} {typo.upper()}, {city} NY {zip_code}",
+    ]
+
+
+def benchmark(buildings=20_000, seed=7):
+    """Listings per second through dedupe() on synthetic addresses with spelling variants"""
+    rng = random.Random(seed)
+    streets = ['President Street', 'Myrtle Avenue', 'West 42nd Street', 'Flatbush Avenue', 'Bedford Avenue',
+               'Park Avenue', 'Broadway', 'Atlantic Avenue', 'Court Street', 'Fulton Street']
+    zips = ['11215', '11211', '11101', '10022', '10036', '10001', '11201', '11238']
+    properties = []
+    for i in range(buildings):
+        street, zip_code = rng.choice(streets), rng.choice(zips)
+        number = rng.randint(1, 9999)
+        for text in rng.sample(_variants(rng, number, street, 'Brooklyn', zip_code), 2):
+            properties.append({'Address': text, 'URL': f"https://example.test/{i}/{len(properties)}"})
+    rng.shuffle(properties)
+    start = time.perf_counter()
+    kept, removed = dedupe(properties)
+    elapsed = time.perf_counter() - start
+    buildings = len({prop['Building ID'] for prop in kept if prop.get('Building ID')})
+    return {'listings': len(properties), 'kept': len(kept), 'buildings': buildings, 'removed': removed,
+            'seconds': elapsed,
+            'listings_per_sec': len(properties) / elapsed if elapsed else 0.0}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize listing addresses and collapse duplicate buildings")
+    parser.add_argument("csv", nargs="*", help="apartments_properties_*.csv files (default: all in this directory)")
+    parser.add_argument("--benchmark", type=int, metavar="BUILDINGS",
+                        help="Time de-duplication of BUILDINGS synthetic buildings, two spellings each")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.benchmark)
+        print(f"⏱️ {result['listings']:,} listings -> {result['kept']:,} kept in {result['buildings']:,} buildings "
+              f"({result['removed']:,} duplicates) "
+              f"in {result['seconds']:.3f}s ({result['listings_per_sec']:,.0f} listings/sec)")
+    else:
+        files = args.csv or sorted(glob.glob("apartments_properties_*.csv"))
+        if not files:
+            print("❌ No CSV files to de-duplicate")
+        else:
+            properties = []
+            for path in files:
+                with open(path, newline='', encoding='utf-8') as f:
+                    properties.extend(csv.DictReader(f))
+            kept, removed = dedupe(properties)
+            print(f"🏢 {len(properties)} listings from {len(files)} file(s): {len(kept)} unique, {removed} duplicates")
@@ -2,7 +2,7 @@
 HomeHunt Data Collector - Web Interface
 Simple web application for scraping real estate data
 """
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context, url_for
 import subprocess
 import threading
 import time
@@ -10,170 +10,169 @@ import os
 import json
 from datetime import datetime
 
+import events
+import export
+import jobs
+import listing_store
+import metrics
+import scraper_service
+from progress_feed import ProgressFeed
+
 app = Flask(__name__)
 
-# Global variables for progress tracking
-scraping_progress = {
+# Shown by /progress before any job has been submitted
+IDLE_PROGRESS = {
     "status": "idle", 
     "current": 0, 
     "total": 0, 
     "message": "Ready to scrape",
     "properties": [],
+    "properties_start": 0,
+    "property_count": 0,
     "sheet_url": None,
     "completed": False
 }
-scraping_thread = None
+idle_feed = ProgressFeed()
+idle_feed.reset(IDLE_PROGRESS)
+
+# Totals for /metrics, fed by each run's timing report
+metrics_registry = metrics.Registry()
+
+def collect_log(stream, lines):
+    """Drain a process's log stream into `lines` so the pipe never fills up"""
+    for line in stream:
+        lines.append(line.rstrip())
+
+def apply_event(job, event):
+    """Update a job's progress from one structured event emitted by main.py"""
+    progress = job.progress
+    kind = event.get("event")
+    if kind == events.PHASE:
+        progress["message"] = event.get("message", progress["message"])
+    elif kind == events.PAGE:
+        progress["total"] += event.get("properties", event.get("cards", 0)) or 0
+        if event.get("location"):
+            progress["message"] = f"Page {event.get('page')} of {event['location']}: extracting {progress['total']} properties..."
+        else:
+            progress["message"] = f"Found {event.get('cards', 0)} properties! Extracting data..."
+    elif kind == events.PROPERTY:
+        record = event.get("record", {})
+        index = event.get("index", progress["property_count"] + 1)
+        job.add_property(record)
+        progress["current"] = index
+        progress["total"] = max(progress["total"], index)
+        progress["current_property"] = {
+            "number": index,
+            "price": record.get("Price"),
+            "address": record.get("Address"),
+            "beds": record.get("Beds"),
+            "baths": record.get("Baths")
+        }
+        progress["message"] = f"Extracting property {index}/{progress['total']}..."
+    elif kind == events.CHANGE:
+        counts = progress.setdefault("changes", {"new": 0, "changed": 0, "removed": 0})
+        counts[event.get("kind")] = counts.get(event.get("kind"), 0) + 1
+    elif kind == events.SAVED:
+        progress["message"] = "Data saved locally and uploading to Google Sheets..."
+        if event.get("run_id"):
+            progress["run_id"] = event["run_id"]
+    elif kind == events.SHEET:
+        if event.get("success"):
+            progress["message"] = "Data uploaded to Google Sheets successfully!"
+            if event.get("url"):
+                progress["sheet_url"] = event["url"]
+    elif kind == events.TIMINGS:
+        progress["timings"] = event.get("timings", {})
+    elif kind == events.METRICS:
+        progress["timing_report"] = event.get("path")
+        metrics_registry.observe_report(event.get("report", {}))
+    elif kind == events.ERROR:
+        progress["message"] = f"Error: {event.get('message')}"
+    elif kind == events.DONE:
+        progress["message"] = f"Successfully extracted {event.get('count', 0)} properties!"
+
+# Values of the field checkboxes in index.html (main.py --fields)
+FIELD_FILTERS = ("price", "address", "beds", "baths", "url")
 
-def scrape_with_subprocess(filters):
-    """Run scraping using subprocess to avoid Unicode issues"""
-    global scraping_progress
+def job_arguments(params):
+    """main.py command-line arguments for a job's search parameters"""
+    args = []
+    if params.get("filters"):
+        args += ["--fields"] + list(params["filters"])
+    if params.get("locations"):
+        args += ["--locations"] + list(params["locations"])
+    if params.get("max_pages") is not None:
+        args += ["--max-pages", str(params["max_pages"])]
+    if params.get("incremental"):
+        args.append("--incremental")
+    if params.get("enrich"):
+        args.append("--enrich")
+    return args
+
+def scrape_with_subprocess(job):
+    """Run one scrape job using subprocess to avoid Unicode issues"""
+    scraping_progress = job.progress
     
     try:
-        scraping_progress["status"] = "running"
-        scraping_progress["message"] = "Setting up Chrome browser..."
-        scraping_progress["current"] = 0
-        scraping_progress["total"] = 0
-        scraping_progress["properties"] = []
-        scraping_progress["completed"] = False
-        
         # Create command to run main.py (your original file)
         import sys
         python_exe = sys.executable
         main_py_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
-        cmd = [python_exe, main_py_path]
+        cmd = [python_exe, main_py_path, "--events"] + job_arguments(job.params)
         
-        scraping_progress["message"] = f"Starting main.py with command: {' '.join(cmd)}"
+        # Prefer the warm scraper service (python scraper_service.py) when it's running
+        service_job = {key: value for key, value in job.params.items() if key in ("locations", "max_pages", "incremental", "enrich")}
+        if job.params.get("filters"):
+            service_job["fields"] = job.params["filters"]
+        process = scraper_service.submit_job(service_job)
+        if process is not None:
+            scraping_progress["message"] = "Submitted job to the warm scraper service..."
+        else:
+            scraping_progress["message"] = f"Starting main.py with command: {' '.join(cmd)}"
+            
+            # Run the subprocess with better error handling
+            try:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,  # JSON-lines progress events
+                    stderr=subprocess.PIPE,  # Human-readable log
+                    text=True,
+                    bufsize=1,  # Line buffered
+                    universal_newlines=True,
+                    encoding='utf-8',  # Explicitly set UTF-8 encoding
+                    errors='replace',  # Replace problematic characters
+                    cwd=os.path.dirname(os.path.abspath(__file__))
+                )
+                scraping_progress["message"] = "Successfully started main.py process..."
+            except Exception as e:
+                scraping_progress["status"] = "error"
+                scraping_progress["message"] = f"Failed to start main.py: {str(e)}"
+                scraping_progress["completed"] = True
+                return
         
-        # Run the subprocess with better error handling
-        try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # Combine stderr with stdout
-                text=True,
-                bufsize=1,  # Line buffered
-                universal_newlines=True,
-                encoding='utf-8',  # Explicitly set UTF-8 encoding
-                errors='replace',  # Replace problematic characters
-                cwd=os.path.dirname(os.path.abspath(__file__))
-            )
-            scraping_progress["message"] = "Successfully started main.py process..."
-        except Exception as e:
-            scraping_progress["status"] = "error"
-            scraping_progress["message"] = f"Failed to start main.py: {str(e)}"
-            scraping_progress["completed"] = True
-            return
+        job.process = process
+        job_manager.publish(job)
         
-        # Read output line by line
-        output_lines = []
-        collected_url = ""
-        line_count = 0
+        # Human-readable log arrives on stderr; the most recent lines are kept for error reports
+        output_lines = job.log
+        if process.stderr is not None:
+            log_reader = threading.Thread(target=collect_log, args=(process.stderr, output_lines))
+            log_reader.daemon = True
+            log_reader.start()
         
+        # Progress arrives as one JSON event per line on stdout
         while True:
             try:
+                if job.cancelled:
+                    process.kill()
+                    return
                 output = process.stdout.readline()
                 if output == '' and process.poll() is not None:
                     break
-                if output:
-                    line = output.strip()
-                    output_lines.append(line)
-                    line_count += 1
-                    
-                    # Debug: Show we're getting output
-                    if line_count == 1:
-                        scraping_progress["message"] = f"Process started! First line: {line[:50]}..."
-                    elif line_count % 5 == 0:
-                        scraping_progress["message"] = f"Processing... (line {line_count})"
-                    
-                    # Collect multi-line URLs
-                    if "🔗 View your sheet:" in line or "View your sheet:" in line:
-                        # Start collecting URL, might be split across lines
-                        url_part = line.replace("🔗 View your sheet:", "").replace("View your sheet:", "").strip()
-                        collected_url = url_part
-                    elif collected_url and not collected_url.startswith("http") and "http" in line:
-                        # Continue collecting URL from next line
-                        collected_url += line.strip()
-                    elif collected_url and collected_url.startswith("http"):
-                        # We have a complete URL
-                        scraping_progress["sheet_url"] = collected_url
-                        collected_url = ""  # Reset
-                    
-                    # Update progress based on output
-                    if "Starting Chrome browser" in line or "Opening Apartments.com" in line:
-                        scraping_progress["message"] = "Setting up Chrome browser..."
-                    elif "Waiting for page to load" in line:
-                        scraping_progress["message"] = "Loading page..."
-                    elif "Searching for property data" in line:
-                        scraping_progress["message"] = "Searching for properties..."
-                    elif "Found" in line and "properties using selector" in line:
-                        try:
-                            # Extract number of properties found
-                            words = line.split()
-                            for word in words:
-                                if word.isdigit():
-                                    scraping_progress["total"] = int(word)
-                                    scraping_progress["message"] = f"Found {word} properties! Extracting data..."
-                                    break
-                        except:
-                            pass
-                    elif "Total property containers found:" in line:
-                        try:
-                            # Extract total containers
-                            total = int(line.split(":")[-1].strip())
-                            scraping_progress["total"] = total
-                            scraping_progress["message"] = f"Processing {total} properties..."
-                        except:
-                            pass
-                    elif "Processing property" in line:
-                        try:
-                            # Extract current property number (format: "Processing property 1/15...")
-                            parts = line.split()
-                            for part in parts:
-                                if "/" in part:
-                                    current, total = part.split("/")
-                                    current = current.replace("...", "")
-                                    scraping_progress["current"] = int(current)
-                                    scraping_progress["total"] = int(total)
-                                    scraping_progress["message"] = f"Extracting property {current}/{total}..."
-                                    break
-                        except:
-                            pass
-                    elif "Property" in line and "$" in line and "|" in line:
-                        try:
-                            # Parse property line: "Property 1: $3,127 - $9,000 | 499 President St, Brooklyn, NY 11215 | Studio - 2 Beds | 1 bath"
-                            parts = line.split(" | ")
-                            if len(parts) >= 4:
-                                price_part = parts[0].split(": ", 1)[1] if ": " in parts[0] else parts[0]
-                                address = parts[1]
-                                beds = parts[2]
-                                baths = parts[3]
-                                
-                                property_data = {
-                                    "Price": price_part,
-                                    "Address": address,
-                                    "Beds": beds,
-                                    "Baths": baths,
-                                    "URL": "See CSV file"
-                                }
-                                scraping_progress["properties"].append(property_data)
-                        except:
-                            pass
-                    elif "Successfully extracted" in line and "properties" in line:
-                        try:
-                            # Extract final count
-                            words = line.split()
-                            for word in words:
-                                if word.isdigit():
-                                    scraping_progress["message"] = f"Successfully extracted {word} properties!"
-                                    break
-                        except:
-                            pass
-                    elif "Data uploaded successfully" in line:
-                        scraping_progress["message"] = "Data uploaded to Google Sheets successfully!"
-                    elif "Data saved to:" in line:
-                        scraping_progress["message"] = "Data saved locally and uploading to Google Sheets..."
-                    elif "Error:" in line:
-                        scraping_progress["message"] = f"Error: {line}"
+                event = events.parse(output)
+                if event:
+                    apply_event(job, event)
+                    job_manager.publish(job)
             except UnicodeDecodeError as e:
                 # Handle Unicode decoding errors specifically
                 scraping_progress["message"] = f"Unicode error reading output: {str(e)} - continuing..."
@@ -194,50 +193,47 @@ def scrape_with_subprocess(filters):
             return
         
         if process.returncode == 0:
-            if scraping_progress["properties"]:
+            if scraping_progress["property_count"]:
                 scraping_progress["status"] = "completed"
-                scraping_progress["message"] = f"Success! Found {len(scraping_progress['properties'])} properties"
+                scraping_progress["message"] = f"Success! Found {scraping_progress['property_count']} properties"
                 scraping_progress["completed"] = True
                 # Set the default Google Sheets URL as fallback
                 if not scraping_progress["sheet_url"]:
                     scraping_progress["sheet_url"] = ""
             else:
-                # Try to read from latest CSV file as backup
+                # Load this job's own run (from its SAVED event) back from the listing store as backup;
+                # the latest run in the store may belong to another job
                 try:
-                    import pandas as pd
-                    csv_files = [f for f in os.listdir('.') if f.startswith('apartments_properties_') and f.endswith('.csv')]
-                    if csv_files:
-                        latest_file = max(csv_files, key=os.path.getctime)
-                        df = pd.read_csv(latest_file)
-                        for _, row in df.iterrows():
-                            property_data = {
-                                "Price": row.get('Price', 'N/A'),
-                                "Address": row.get('Address', 'N/A'),
-                                "Beds": row.get('Beds', 'N/A'),
-                                "Baths": row.get('Baths', 'N/A'),
-                                "URL": row.get('URL', 'N/A')
-                            }
-                            scraping_progress["properties"].append(property_data)
-                        
-                        scraping_progress["status"] = "completed"
-                        scraping_progress["message"] = f"Success! Found {len(scraping_progress['properties'])} properties (loaded from CSV)"
-                        scraping_progress["completed"] = True
+                    run_id = scraping_progress.get("run_id")
+                    offset = 0
+                    while run_id:
+                        records, has_more = listing_store_db.query(run_id=run_id, limit=listing_store.MAX_PAGE_SIZE,
+                                                                   offset=offset)
+                        for record in records:
+                            job.add_property({field: record[field] for field in ("Price", "Address", "Beds", "Baths", "URL")
+                                              if record[field] is not None})
+                        offset += len(records)
+                        if not has_more:
+                            break
+                    
+                    scraping_progress["status"] = "completed"
+                    scraping_progress["completed"] = True
+                    if scraping_progress["property_count"]:
+                        scraping_progress["message"] = f"Success! Found {scraping_progress['property_count']} properties (loaded from the listing store)"
                         # Set the default Google Sheets URL as fallback
                         if not scraping_progress["sheet_url"]:
                             scraping_progress["sheet_url"] = ""
                     else:
-                        scraping_progress["status"] = "completed"
                         scraping_progress["message"] = "Completed but no properties found"
-                        scraping_progress["completed"] = True
                 except Exception as e:
                     scraping_progress["status"] = "completed"
                     scraping_progress["message"] = "Completed - check CSV files for data"
                     scraping_progress["completed"] = True
         else:
             # Check for errors
-            error_output = process.stderr.read()
+            last_line = output_lines[-1] if output_lines else ""
             scraping_progress["status"] = "error"
-            scraping_progress["message"] = f"Error occurred during scraping"
+            scraping_progress["message"] = f"Error occurred during scraping: {last_line}" if last_line else "Error occurred during scraping"
             scraping_progress["completed"] = True
             
     except Exception as e:
@@ -250,46 +246,226 @@ def index():
     """Main page with checkboxes and scraping interface"""
     return render_template('index.html')
 
+# Jobs run on a bounded worker pool; state is kept in SQLite across restarts
+job_manager = jobs.JobManager(scrape_with_subprocess,
+                              max_workers=int(os.environ.get('HOMEHUNT_MAX_JOBS', jobs.DEFAULT_MAX_WORKERS)),
+                              store=jobs.JobStore(),
+                              on_finish=lambda job: metrics_registry.observe_job(
+                                  job.status, job.finished_at - (job.started_at or job.finished_at)))
+
+# Every scrape run's listings, indexed for /properties queries
+listing_store_db = listing_store.ListingStore()
+
+@app.before_request
+def start_job_workers():
+    """Start job workers on first request (not at import, which the debug reloader repeats)"""
+    job_manager.start()
+
+def job_params_from_request():
+    """Search parameters and priority from a form post or JSON body"""
+    data = request.get_json(silent=True) or {}
+    if data:
+        filters = data.get('filters', [])
+        locations = data.get('locations')
+        max_pages = data.get('max_pages')
+        priority = data.get('priority', jobs.DEFAULT_PRIORITY)
+        incremental = bool(data.get('incremental'))
+        enrich = bool(data.get('enrich'))
+    else:
+        filters = request.form.getlist('filters')
+        locations = request.form.getlist('locations') or None
+        max_pages = request.form.get('max_pages', type=int)
+        priority = request.form.get('priority', jobs.DEFAULT_PRIORITY, type=int)
+        incremental = request.form.get('incremental') in ('1', 'true', 'on')
+        enrich = request.form.get('enrich') in ('1', 'true', 'on')
+    # Only the ticked fields are extracted; none ticked (or an old client) means all of them
+    filters = [value.lower() for value in filters if value.lower() in FIELD_FILTERS]
+    params = {"filters": filters}
+    if locations:
+        params["locations"] = locations
+    if max_pages is not None:
+        params["max_pages"] = int(max_pages)
+    if incremental:
+        params["incremental"] = True
+    if enrich:
+        params["enrich"] = True
+    return params, int(priority)
+
+def sse_response(feed):
+    """Server-Sent Events: a snapshot on connect, then only the changes as they happen"""
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    response = Response(stream_with_context(feed.stream(last_event_id)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/scrape', methods=['POST'])
 def start_scraping():
     """Start scraping with selected filters"""
-    global scraping_thread, scraping_status
-    
-    if scraping_progress["status"] == "running":
-        return jsonify({"error": "Data collection already in progress!"})
-    
-    # Get selected filters from checkboxes
-    filters = request.form.getlist('filters')
-    
-    # Start scraping in background
-    scraping_thread = threading.Thread(target=scrape_with_subprocess, args=(filters,))
-    scraping_thread.daemon = True
-    scraping_thread.start()
-    
-    return jsonify({"success": True, "message": "Data collection started!"})
+    params, priority = job_params_from_request()
+    job = job_manager.submit(params, priority)
+    return jsonify({"success": True, "job_id": job.id, "message": "Data collection started!"})
 
 @app.route('/progress')
 def get_progress():
-    """Get current scraping progress"""
-    return jsonify(scraping_progress)
+    """Get progress of the most recent job"""
+    job = job_manager.latest()
+    return jsonify(job.progress if job else IDLE_PROGRESS)
+
+@app.route('/progress/stream')
+def stream_progress():
+    """Stream progress of the most recent job"""
+    job = job_manager.latest()
+    return sse_response(job.feed if job else idle_feed)
+
+@app.route('/jobs', methods=['GET', 'POST'])
+def jobs_collection():
+    """List jobs, or submit a new one (optional priority: higher runs first)"""
+    if request.method == 'POST':
+        params, priority = job_params_from_request()
+        job = job_manager.submit(params, priority)
+        return jsonify(job.summary()), 202
+    return jsonify({"jobs": job_manager.list()})
+
+@app.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_detail(job_id):
+    """Job summary; DELETE cancels it"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    if request.method == 'DELETE':
+        job_manager.cancel(job_id)
+    return jsonify(job.summary())
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify({"cancelled": job_manager.cancel(job_id), "job": job.summary()})
+
+@app.route('/jobs/<job_id>/progress')
+def job_progress(job_id):
+    """Full progress for one job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.progress)
+
+@app.route('/jobs/<job_id>/properties')
+def job_properties(job_id):
+    """Every listing one job found, in order, one page at a time (cursor from next_cursor)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    limit = max(1, min(request.args.get('limit', listing_store.DEFAULT_PAGE_SIZE, type=int),
+                       listing_store.MAX_PAGE_SIZE))
+    try:
+        properties, next_cursor = job.properties_page(request.args.get('cursor'), limit)
+    except (ValueError, OSError):
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({
+        "properties": properties,
+        "count": job.progress["property_count"],
+        "next_cursor": next_cursor
+    })
+
+@app.route('/jobs/<job_id>/log')
+def job_log(job_id):
+    """The most recent log lines of one job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify({"lines": list(job.log)})
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """Stream progress for one job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return sse_response(job.feed)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint: phase timings, page/selector/field counters and job states"""
+    metrics_registry.set_jobs(job_manager.counts())
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+def property_filters():
+    """Listing store filters from the query string (shared by /properties and /properties/export)"""
+    run = request.args.get('run', 'latest')
+    return {
+        'run_id': listing_store_db.latest_run_id() if run == 'latest' else (None if run == 'all' else run),
+        'url': request.args.get('url'),
+        'address': request.args.get('address'),
+        'building': request.args.get('building'),
+        'min_price': request.args.get('min_price', type=int),
+        'max_price': request.args.get('max_price', type=int),
+        'beds': request.args.get('beds'),
+        'since': request.args.get('since', type=float),
+        'until': request.args.get('until', type=float),
+    }
 
 @app.route('/properties')
 def get_properties():
-    """Get collected properties data"""
+    """Get collected properties from the listing store, one page at a time.
+
+    Query parameters: run (a run id, "latest" - the default - or "all"), url, address
+    (prefix), building (a building ID), min_price, max_price, beds, since/until (Unix time),
+    limit, offset.
+    """
     try:
-        # Try to read the latest CSV file
-        csv_files = [f for f in os.listdir('.') if f.startswith('apartments_properties_') and f.endswith('.csv')]
-        if csv_files:
-            latest_file = max(csv_files, key=os.path.getctime)
-            import pandas as pd
-            df = pd.read_csv(latest_file)
-            properties = df.to_dict('records')
-            return jsonify({"properties": properties})
-        else:
-            return jsonify({"properties": []})
+        filters = property_filters()
+        run_id = filters['run_id']
+        if request.args.get('run', 'latest') == 'latest' and run_id is None:
+            return jsonify({"properties": [], "run_id": None, "has_more": False, "next_offset": None})
+        limit = request.args.get('limit', listing_store.DEFAULT_PAGE_SIZE, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        properties, has_more = listing_store_db.query(limit=limit, offset=offset, **filters)
+        return jsonify({
+            "properties": properties,
+            "run_id": run_id,
+            "has_more": has_more,
+            "next_offset": offset + len(properties) if has_more else None
+        })
     except Exception as e:
         return jsonify({"properties": [], "error": str(e)})
 
+@app.route('/properties/export')
+def export_properties():
+    """Stream matching properties as NDJSON or CSV, newest first, compressed when the client accepts it.
+
+    Takes the /properties filters plus format (ndjson - the default - or csv), limit (none = all)
+    and cursor (from X-Next-Cursor). The ETag changes only when listings are added.
+    """
+    fmt = request.args.get('format') or ('csv' if request.accept_mimetypes.best == 'text/csv' else 'ndjson')
+    if fmt not in export.FORMATS:
+        return jsonify({"error": f"Unknown format: {fmt}"}), 400
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    coding = export.negotiate(request.headers.get('Accept-Encoding'))
+    tag = export.etag(listing_store_db.version(), fmt, coding, request.args.items(multi=True))
+    headers = {'ETag': f'"{tag}"', 'Vary': 'Accept, Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(tag):
+        return Response(status=304, headers=headers)
+    filters = property_filters()
+    try:
+        records = listing_store_db.export(filters, cursor, limit)
+        next_cursor = listing_store_db.next_cursor(filters, cursor, limit)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        headers['X-Next-Cursor'] = next_cursor
+        headers['Link'] = f'<{url_for("export_properties", **args)}>; rel="next"'
+    if coding != 'identity':
+        headers['Content-Encoding'] = coding
+    return Response(stream_with_context(export.body(records, fmt, coding)),
+                    mimetype=export.FORMATS[fmt], headers=headers)
+
 if __name__ == '__main__':
     print("🏠 HomeHunt Data Collector Web Interface")
     print("🌐 Starting web server...")
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Batch runs over many cities/searches with resumable checkpoints
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urlparse
+
+import addresses
+import browser
+import crawler
+import extractor
+import listing_store
+import main
+import metrics
+import page_archive
+import selector_stats
+
+CHECKPOINT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch_runs")
+DEFAULT_PROCESSES = 2
+DEFAULT_SESSIONS = 1
+
+# Per-page fields handed back to the parent for the run's timing report
+PAGE_SUMMARY_KEYS = ('error', 'cards', 'source', 'selector', 'field_stats', 'network', 'timings')
+
+
+def parse_query(line):
+    """Search path for one line of a queries file, or None for blanks and comments.
+
+    A line is a location slug with optional filter segments ("new-york-ny 2-bedrooms-under-3000")
+    or a full apartments.com search URL.
+    """
+    line = line.split('#', 1)[0].strip()
+    if not line:
+        return None
+    if line.startswith('http'):
+        parsed = urlparse(line)
+        if parsed.netloc != urlparse(extractor.BASE_URL).netloc:
+            raise ValueError(f"Not an apartments.com search URL: {line}")
+        path = parsed.path.strip('/')
+        # A URL copied from a later results page still means the whole search
+        path = re.sub(r'/\d+$', '', path)
+    else:
+        path = '/'.join(part.strip('/') for part in line.split())
+    if not path:
+        raise ValueError(f"No location in query: {line}")
+    return path
+
+
+def load_queries(path):
+    """Queries from a file, in order, without duplicates"""
+    queries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            query = parse_query(line)
+            if query and query not in queries:
+                queries.append(query)
+    return queries
+
+
+def city_of(query):
+    """City partition for a query's listings: its location slug"""
+    return query.split('/', 1)[0]
+
+
+def work_digest(queries, max_pages):
+    return hashlib.sha1(json.dumps([queries, max_pages]).encode('utf-8')).hexdigest()[:8]
+
+
+def batch_id(queries, max_pages):
+    """Name of a new batch: the date it started plus a hash of the work"""
+    return f"{datetime.now().strftime('%Y%m%d')}_{work_digest(queries, max_pages)}"
+
+
+def query_id(query):
+    slug = re.sub(r'[^a-z0-9]+', '-', query.lower()).strip('-')[:40]
+    return f"{slug}_{hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _write_json(path, data):
+    """Write via a temp file so an interrupted run never leaves half a checkpoint"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def default_checkpoint_dir(queries, max_pages, root=CHECKPOINT_ROOT):
+    """This work's unfinished batch, even one started on an earlier day, else a new batch_id() directory"""
+    name = (_read_json(os.path.join(root, 'active.json')) or {}).get(work_digest(queries, max_pages))
+    if name and os.path.isdir(os.path.join(root, name)):
+        return os.path.join(root, name)
+    return os.path.join(root, batch_id(queries, max_pages))
+
+
+def set_active(queries, max_pages, name, root=CHECKPOINT_ROOT):
+    """Record `name` as this work's unfinished batch in root/active.json (None clears it)"""
+    path = os.path.join(root, 'active.json')
+    active = _read_json(path) or {}
+    if name:
+        active[work_digest(queries, max_pages)] = name
+    else:
+        active.pop(work_digest(queries, max_pages), None)
+    os.makedirs(root, exist_ok=True)
+    _write_json(path, active)
+
+
+def page_path(checkpoint_dir, query, page):
+    return os.path.join(checkpoint_dir, 'pages', f"{query_id(query)}_p{page}.json")
+
+
+def done_path(checkpoint_dir, query):
+    return os.path.join(checkpoint_dir, 'pages', f"{query_id(query)}.done")
+
+
+def save_page(checkpoint_dir, query, result):
+    task = result['task']
+    _write_json(page_path(checkpoint_dir, query, task.page), {
+        'location': task.location, 'page': task.page, 'url': task.url,
+        'cards': result['cards'], 'page_count': result['page_count'], 'properties': result['properties']})
+
+
+def load_pages(checkpoint_dir, query):
+    """Checkpointed pages of one query as crawler results, in page order"""
+    prefix = query_id(query) + '_p'
+    pages = []
+    for name in os.listdir(os.path.join(checkpoint_dir, 'pages')):
+        if not (name.startswith(prefix) and name.endswith('.json')):
+            continue
+        data = _read_json(os.path.join(checkpoint_dir, 'pages', name))
+        if data is None:
+            continue
+        pages.append({'task': crawler.PageTask(data['location'], data['page'], data['url']),
+                      'properties': data['properties'], 'cards': data['cards'],
+                      'page_count': data['page_count'], 'error': None})
+    return sorted(pages, key=lambda result: result['task'].page)
+
+
+def _init_worker(load_all_resources, capture, fixed_selectors, archive_pages=True):
+    """Carry the parent's browser settings into each worker process"""
+    if load_all_resources:
+        browser.set_resource_policy(browser.ResourcePolicy.load_everything())
+    browser.set_network_capture(capture)
+    selector_stats.set_enabled(not fixed_selectors)
+    page_archive.set_enabled(archive_pages)
+
+
+def run_query(query, checkpoint_dir, max_pages=0, sessions=DEFAULT_SESSIONS, wait_timeout=browser.PAGE_WAIT_TIMEOUT):
+    """Crawl the pages of one query not yet checkpointed (runs in a worker process)"""
+    done = load_pages(checkpoint_dir, query)
+    summaries = []
+
+    def on_page(result):
+        if not result['error']:
+            save_page(checkpoint_dir, query, result)
+        summaries.append({key: result[key] for key in PAGE_SUMMARY_KEYS})
+
+    selectors = selector_stats.SelectorStats() if selector_stats.enabled() else None
+    archive = main.open_archive(f"batch_{os.path.basename(checkpoint_dir)}") if page_archive.enabled() else None
+    with crawler.BrowserPool(sessions) as pool:
+        results = crawler.crawl([query], max_pages=max_pages, workers=sessions, wait_timeout=wait_timeout,
+                                on_page=on_page, pool=pool, selectors=selectors, done=done, archive=archive)
+    if selectors is not None:
+        try:
+            selectors.save()
+        except OSError:
+            pass
+    errors = [result['error'] for result in results if result['error']]
+    if not errors:
+        with open(done_path(checkpoint_dir, query), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+    return {'query': query, 'resumed': len(done), 'pages': len(results), 'errors': errors,
+            'listings': sum(len(result['properties']) for result in results), 'summaries': summaries}
+
+
+def consolidate(checkpoint_dir, queries, buildings=None):
+    """Every checkpointed listing, de-duplicated across queries by building and unit (first seen wins); returns (properties, cities)"""
+    buildings = buildings if buildings is not None else addresses.BuildingIndex()
+    properties = []
+    cities = []
+    seen = set()
+    for query in queries:
+        for result in load_pages(checkpoint_dir, query):
+            for prop in result['properties']:
+                key = addresses.tag(prop, buildings) or listing_store.listing_key(prop)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                properties.append(prop)
+                cities.append(city_of(query))
+    return properties, cities
+
+
+def run_batch(queries, max_pages=0, processes=DEFAULT_PROCESSES, sessions=DEFAULT_SESSIONS,
+              wait_timeout=browser.PAGE_WAIT_TIMEOUT, checkpoint_dir=None, fresh=False, partial=False,
+              output=main.DEFAULT_OUTPUT, upload=False, load_all_resources=False, capture=False, fixed_selectors=False,
+              archive_pages=True):
+    """Fan queries out over `processes` browser worker processes, then save one de-duplicated run.
+
+    Each finished page is checkpointed under checkpoint_dir; running the same batch again only
+    loads the pages that are missing. Without a checkpoint_dir, the batch is recorded as active
+    until it is saved, so a re-run resumes it even on a later day. Returns the saved run id, or
+    None if nothing was saved.
+    """
+    tracked = checkpoint_dir is None
+    checkpoint_dir = checkpoint_dir or default_checkpoint_dir(queries, max_pages)
+    if fresh and os.path.isdir(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+    os.makedirs(os.path.join(checkpoint_dir, 'pages'), exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, 'manifest.json')
+    manifest = _read_json(manifest_path) or {'queries': queries, 'max_pages': max_pages,
+                                             'created_at': time.time(), 'saved_run_id': None}
+    _write_json(manifest_path, manifest)
+    if tracked and not manifest['saved_run_id']:
+        set_active(queries, max_pages, os.path.basename(checkpoint_dir))
+
+    todo = [query for query in queries if not os.path.exists(done_path(checkpoint_dir, query))]
+    print(f"📦 Batch {os.path.basename(checkpoint_dir)}: {len(queries)} queries, "
+          f"{len(queries) - len(todo)} already complete, {len(todo)} to crawl on {processes} process(es)")
+    if not todo and manifest['saved_run_id']:
+        print(f"✅ Already saved as run {manifest['saved_run_id']} (use --fresh to start over)")
+        return manifest['saved_run_id']
+
+    run_id = listing_store.new_run_id()
+    run = metrics.start_run(run_id)
+    incomplete = []
+    phase_start = time.perf_counter()
+    if todo:
+        executor = ProcessPoolExecutor(max_workers=min(processes, len(todo)), initializer=_init_worker,
+                                       initargs=(load_all_resources, capture, fixed_selectors, archive_pages))
+        try:
+            futures = {executor.submit(run_query, query, checkpoint_dir, max_pages, sessions, wait_timeout): query
+                       for query in todo}
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    incomplete.append(query)
+                    print(f"❌ {query}: {e}")
+                    continue
+                for summary in outcome['summaries']:
+                    run.add_page(summary)
+                resumed = f", {outcome['resumed']} from checkpoint" if outcome['resumed'] else ""
+                print(f"📄 {query}: {outcome['pages']} page(s), {outcome['listings']} listing(s){resumed}")
+                if outcome['errors']:
+                    incomplete.append(query)
+                    print(f"   ⚠️ {len(outcome['errors'])} page(s) failed: {outcome['errors'][0]}")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            print("\n⏸️ Interrupted - run the same command again to resume from the checkpoints")
+            raise
+        executor.shutdown()
+        elapsed = time.perf_counter() - phase_start
+        run.add_phase('crawl', elapsed)
+        print(f"⏱️ Crawled {len(todo)} quer{'y' if len(todo) == 1 else 'ies'} in {elapsed:.1f}s")
+
+    if incomplete and not partial:
+        print(f"⚠️ {len(incomplete)} quer{'y is' if len(incomplete) == 1 else 'ies are'} incomplete; "
+              f"run again to retry the missing pages (or pass --partial to save what there is)")
+        return None
+
+    buildings = main.load_buildings()
+    properties, cities = consolidate(checkpoint_dir, queries, buildings)
+    print(f"🧮 {len(properties)} unique listing(s) across {len(queries)} queries")
+    main.save_properties(properties, upload=upload, locations=cities, run_id=run_id, output=output,
+                         buildings=buildings)
+    main.write_timing_report()
+    if properties:
+        manifest['saved_run_id'] = run_id
+        _write_json(manifest_path, manifest)
+    if tracked:
+        # Finished: the next run of this work starts a new batch
+        set_active(queries, max_pages, None)
+    return manifest['saved_run_id']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt batch runner - many cities/searches, resumable")
+    parser.add_argument("queries", help="File with one location slug (plus optional filter segments) or search URL per line")
+    parser.add_argument("--max-pages", type=int, default=0,
+                        help="Results pages per query; 0 walks every page (default: %(default)s)")
+    parser.add_argument("--processes", type=int, default=DEFAULT_PROCESSES,
+                        help="Worker processes, each with its own Chrome (default: %(default)s)")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS,
+                        help="Chrome sessions per worker process (default: %(default)s)")
+    parser.add_argument("--wait-timeout", type=float, default=browser.PAGE_WAIT_TIMEOUT,
+                        help="Maximum seconds to wait for results to render (default: %(default)s)")
+    parser.add_argument("--checkpoint-dir",
+                        help="Checkpoint directory (default: the unfinished batch of these queries, "
+                             "else a new batch_runs/<date>_<hash of the queries>)")
+    parser.add_argument("--fresh", action="store_true", help="Discard existing checkpoints and start over")
+    parser.add_argument("--partial", action="store_true", help="Save the consolidated output even if some pages failed")
+    parser.add_argument("--output", choices=main.OUTPUT_FORMATS, default=main.DEFAULT_OUTPUT,
+                        help="Parquet history, a CSV file, or both (default: %(default)s)")
+    parser.add_argument("--upload", action="store_true", help="Also upload the consolidated results to Google Sheets")
+    parser.add_argument("--load-all-resources", action="store_true",
+                        help="Don't block images, fonts and third-party trackers in Chrome")
+    parser.add_argument("--capture", action="store_true",
+                        help="Read listings from the site's JSON/XHR responses, falling back to the page HTML")
+    parser.add_argument("--fixed-selectors", action="store_true",
+                        help="Always try card/field selectors in their default order (no learning)")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Don't keep the rendered results pages in page_archive/ for re-parsing")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    if not queries:
+        print(f"❌ No queries in {args.queries}")
+    else:
+        try:
+            run_batch(queries, max_pages=args.max_pages, processes=args.processes, sessions=args.sessions,
+                      wait_timeout=args.wait_timeout, checkpoint_dir=args.checkpoint_dir, fresh=args.fresh,
+                      partial=args.partial, output=args.output, upload=args.upload,
+                      load_all_resources=args.load_all_resources, capture=args.capture,
+                      fixed_selectors=args.fixed_selectors, archive_pages=not args.no_archive)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Extraction benchmark against saved HTML fixtures
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import extractor
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(ROOT_DIR, "fixtures")
+
+# app.py starts a fresh interpreter for every job, so `import main` is paid each time:
+# keep it under budget and free of the heavy modules only some runs need
+IMPORT_BUDGET_MS = 100
+LAZY_MODULES = ('pandas', 'pyarrow', 'gspread', 'google.oauth2', 'selenium.webdriver', 'psutil', 'httpx')
+
+# Field extractors timed individually, in the order extract_card runs them. Each is called with
+# the card and its Beds value, which extract_card hands to extract_baths for its estimate
+FIELD_EXTRACTORS = {
+    'Price': lambda card, beds: extractor.extract_price(card),
+    'Address': lambda card, beds: extractor.extract_address(card),
+    'Beds': lambda card, beds: extractor.extract_beds(card),
+    'Baths': extractor.extract_baths,
+    'URL': lambda card, beds: extractor.extract_url(card),
+}
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Load every saved results page (*.html) in the fixtures directory"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def benchmark_page(page_html, iterations=50):
+    """Time full single-pass extraction of one page (parse + cards + fields)"""
+    root = extractor.parse_page(page_html)
+    _, cards = extractor.find_cards(root, max_cards=None)
+    extractor.extract_listings(page_html, max_cards=None)  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        extractor.extract_listings(page_html, max_cards=None)
+    elapsed = time.perf_counter() - start
+
+    ms_per_page = elapsed / iterations * 1000
+    return {
+        'cards': len(cards),
+        'ms_per_page': ms_per_page,
+        'cards_per_sec': len(cards) * iterations / elapsed if elapsed else 0.0,
+    }
+
+
+def benchmark_fields(page_html, iterations=50):
+    """Per-field extraction latency (microseconds per card) and miss rate"""
+    root = extractor.parse_page(page_html)
+    _, cards = extractor.find_cards(root, max_cards=None)
+    # Beds comes first and isn't part of the other fields' timings
+    inputs = [(card, extractor.extract_beds(card)) for card in cards]
+    results = {}
+    for field, extract in FIELD_EXTRACTORS.items():
+        misses = sum(1 for card, beds in inputs if extract(card, beds) == extractor.NOT_FOUND)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for card, beds in inputs:
+                extract(card, beds)
+        elapsed = time.perf_counter() - start
+        calls = iterations * len(cards)
+        results[field] = {
+            'us_per_card': elapsed / calls * 1e6 if calls else 0.0,
+            'miss_rate': misses / len(cards) if cards else 0.0,
+        }
+    return results
+
+
+def measure_memory(page_html):
+    """Peak Python-heap memory (KiB) while extracting one page (excludes lxml's C-side tree)"""
+    tracemalloc.start()
+    try:
+        extractor.extract_listings(page_html, max_cards=None)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def measure_imports(module='main', runs=5):
+    """Import cost of `module` in fresh interpreters (python -X importtime), best of `runs`.
+
+    Returns {'ms', 'modules', 'slowest'}; slowest lists (module, cumulative ms) of its top dependencies.
+    """
+    best = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stderr
+        entries = []
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            entries.append((name.strip(), int(cumulative) / 1000, len(name) - len(name.lstrip())))
+        # Children are listed before their parent: module's own imports are the lines just above it
+        end = next(i for i, (name, _, depth) in enumerate(entries) if name == module and depth == 1)
+        start = end
+        while start > 0 and entries[start - 1][2] > 1:
+            start -= 1
+        own = entries[start:end]
+        if best is None or entries[end][1] < best['ms']:
+            best = {
+                'ms': entries[end][1],
+                'modules': sorted({name for name, _, _ in own}),
+                'slowest': sorted(((name, ms) for name, ms, depth in own if depth == 3), key=lambda item: -item[1])[:8],
+            }
+    return best
+
+
+def check_imports(module='main', budget_ms=IMPORT_BUDGET_MS):
+    """Problems with `module`'s import cost: over budget, or a lazy module loaded eagerly"""
+    report = measure_imports(module)
+    problems = [f"{module} pulls in {name} at import" for name in report['modules']
+                if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)]
+    if report['ms'] > budget_ms:
+        problems.append(f"import {module} took {report['ms']:.0f} ms (budget {budget_ms} ms)")
+    return report, sorted(set(problems))
+
+
+def run_benchmarks(fixtures_dir=FIXTURES_DIR, iterations=50):
+    """Benchmark every fixture page and return a report dict per page"""
+    report = {}
+    for name, page_html in load_fixtures(fixtures_dir):
+        page_report = benchmark_page(page_html, iterations)
+        page_report['fields'] = benchmark_fields(page_html, iterations)
+        page_report['peak_kib'] = measure_memory(page_html)
+        report[name] = page_report
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing extraction on saved HTML pages")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of saved results pages")
+    parser.add_argument("--iterations", type=int, default=50, help="Extraction runs per page")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    parser.add_argument("--imports", action="store_true",
+                        help=f"Check `import main` against its {IMPORT_BUDGET_MS} ms budget instead (exit status 1 if over)")
+    args = parser.parse_args()
+
+    if args.imports:
+        report, problems = check_imports()
+        print(f"⏱️ import main: {report['ms']:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+        for name, ms in report['slowest']:
+            print(f"   {name:<20} {ms:7.1f} ms")
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✅ Within budget")
+        return
+
+    print(f"⏱️ Benchmarking extraction over {args.fixtures} ({args.iterations} iterations per page)")
+    report = run_benchmarks(args.fixtures, args.iterations)
+    if not report:
+        print(f"❌ No .html fixtures found in {args.fixtures}")
+        return
+
+    for name, page_report in report.items():
+        print(f"\n📄 {name}: {page_report['cards']} cards")
+        print(f"   {page_report['ms_per_page']:.2f} ms/page | {page_report['cards_per_sec']:.0f} cards/sec | peak {page_report['peak_kib']:.0f} KiB")
+        for field, stats in page_report['fields'].items():
+            print(f"   {field:<8} {stats['us_per_card']:8.1f} µs/card | miss rate {stats['miss_rate']:.0%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Chrome session setup and readiness-driven page waits
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import extractor
+
+# selenium.webdriver is imported where a session is built, so modules that only need
+# the constants and policies here (fixture runs, the web app) don't pay for it
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+PAGE_LOAD_TIMEOUT = 30
+
+# Page wait tuning (seconds)
+PAGE_WAIT_TIMEOUT = 10     # ceiling; the old fixed sleep
+POLL_INTERVAL = 0.2
+NETWORK_IDLE_WINDOW = 0.5  # no new resource requests for this long = idle
+EMPTY_PAGE_GRACE = 2.0     # loaded + idle this long with no cards = give up early
+
+# One round-trip per poll: document state, whether any card selector matches, resource count
+_READINESS_SCRIPT = """
+var selectors = arguments[0];
+var hasCard = false;
+for (var i = 0; i < selectors.length && !hasCard; i++) {
+    try { hasCard = document.querySelector(selectors[i]) !== null; } catch (e) {}
+}
+var resources = window.performance && performance.getEntriesByType
+    ? performance.getEntriesByType('resource').length : 0;
+return [document.readyState, hasCard, resources];
+"""
+
+
+# Resource blocking: listings only need the HTML and the site's own scripts
+BLOCK_IMAGES = True
+BLOCKED_URL_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.com*", "*amazon-adsystem.com*", "*facebook.net*", "*facebook.com/tr*",
+    "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*bing.com/bat*", "*criteo.*", "*taboola.com*",
+]
+ALLOWED_URL_PATTERNS = []  # checked before the block list (needs a Chrome with urlPatterns support)
+
+# Requests and bytes of the current document: navigation entry plus every resource
+_TRANSFER_SCRIPT = """
+var entries = performance.getEntriesByType('resource');
+var nav = performance.getEntriesByType('navigation')[0];
+var transferred = nav ? nav.transferSize : 0;
+var decoded = nav ? nav.decodedBodySize : 0;
+for (var i = 0; i < entries.length; i++) {
+    transferred += entries[i].transferSize || 0;
+    decoded += entries[i].decodedBodySize || 0;
+}
+return [entries.length + (nav ? 1 : 0), transferred, decoded];
+"""
+
+
+class ResourcePolicy:
+    """Which requests a session skips: images via Chrome prefs, URL patterns via CDP"""
+
+    def __init__(self, block_images=BLOCK_IMAGES, blocked=None, allowed=None):
+        self.block_images = block_images
+        self.blocked = list(BLOCKED_URL_PATTERNS if blocked is None else blocked)
+        self.allowed = list(ALLOWED_URL_PATTERNS if allowed is None else allowed)
+
+    @classmethod
+    def load_everything(cls):
+        return cls(block_images=False, blocked=[], allowed=[])
+
+    def apply(self, driver):
+        """Install the URL block list on a running session (Chrome DevTools Protocol)"""
+        if not self.blocked:
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        if self.allowed:
+            # First matching pattern wins, so allow-list entries go first
+            patterns = ([{"urlPattern": pattern, "block": False} for pattern in self.allowed] +
+                        [{"urlPattern": pattern, "block": True} for pattern in self.blocked])
+            try:
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": patterns})
+                return
+            except WebDriverException:
+                pass  # older Chrome: plain block list only
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked})
+
+
+_resource_policy = ResourcePolicy()
+_capture_network = False
+
+
+def set_resource_policy(policy):
+    """Use `policy` for every session started from now on"""
+    global _resource_policy
+    _resource_policy = policy
+
+
+def set_network_capture(enabled):
+    """Record each session's network traffic (performance log) so listings can be read from JSON responses"""
+    global _capture_network
+    _capture_network = enabled
+
+
+def network_capture_enabled():
+    return _capture_network
+
+
+def page_transfer_stats(driver):
+    """Requests made and bytes transferred/decoded by the current page (Resource Timing).
+
+    Cross-origin responses without Timing-Allow-Origin count as requests with 0 bytes.
+    """
+    try:
+        requests, transferred, decoded = driver.execute_script(_TRANSFER_SCRIPT)
+    except WebDriverException:
+        return None
+    return {'requests': requests, 'bytes': transferred, 'decoded_bytes': decoded}
+
+
+def build_chrome_options(profile_dir=None, policy=None):
+    """Chrome options used for every scraping session.
+
+    profile_dir keeps a persistent Chrome profile (cache, cookies) across sessions.
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    policy = policy or _resource_policy
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-features=VizDisplayCompositor")
+    options.add_argument("--disable-web-security")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-background-networking")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={profile_dir}")
+    if policy.block_images:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if _capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def create_driver(options=None, policy=None):
+    """Start a Chrome session with the standard options and resource blocking"""
+    from selenium import webdriver
+
+    policy = policy or _resource_policy
+    driver = webdriver.Chrome(options=options or build_chrome_options(policy=policy))
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    try:
+        policy.apply(driver)
+    except WebDriverException:
+        pass  # blocking is an optimisation; never fail a session over it
+    return driver
+
+
+class PageReadiness:
+    """WebDriverWait condition: cards rendered, document complete and network idle.
+
+    Records time-to-first-card and time-to-ready (seconds since the wait started).
+    """
+
+    def __init__(self, card_selectors=None, idle_window=NETWORK_IDLE_WINDOW, empty_grace=EMPTY_PAGE_GRACE):
+        self.card_selectors = list(card_selectors or extractor.CARD_SELECTORS)
+        self.idle_window = idle_window
+        self.empty_grace = empty_grace
+        self.start = time.perf_counter()
+        self.time_to_first_card = None
+        self.time_to_ready = None
+        self.has_cards = False
+        self._resources = -1
+        self._resources_changed = self.start
+
+    def __call__(self, driver):
+        now = time.perf_counter()
+        try:
+            ready_state, has_card, resources = driver.execute_script(_READINESS_SCRIPT, self.card_selectors)
+        except WebDriverException:
+            return False
+
+        if has_card and self.time_to_first_card is None:
+            self.time_to_first_card = now - self.start
+        self.has_cards = self.has_cards or has_card
+
+        if resources != self._resources:
+            self._resources = resources
+            self._resources_changed = now
+        idle_for = now - self._resources_changed
+
+        if ready_state != 'complete' or idle_for < self.idle_window:
+            return False
+        if self.has_cards or idle_for >= self.empty_grace:
+            self.time_to_ready = now - self.start
+            return True
+        return False
+
+
+def wait_for_results(driver, timeout=PAGE_WAIT_TIMEOUT, card_selectors=None):
+    """Wait until the results page is ready, up to `timeout` seconds.
+
+    Returns a timings dict: time_to_first_card, time_to_ready (None if not reached),
+    waited and timed_out.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    condition = PageReadiness(card_selectors)
+    timed_out = False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        timed_out = True
+    return {
+        'time_to_first_card': condition.time_to_first_card,
+        'time_to_ready': condition.time_to_ready,
+        'waited': time.perf_counter() - condition.start,
+        'timed_out': timed_out,
+    }
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Structured listings from the page's own JSON (XHR/fetch responses, inline data)
+import base64
+import binascii
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+import extractor
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CAPTURE_RESOURCE_TYPES = ('XHR', 'Fetch')
+
+# Candidate keys per field, most specific first (compared case-insensitively)
+PRICE_KEYS = ('rentRange', 'priceRange', 'formattedRent', 'formattedPrice', 'rent', 'price', 'rentAmount', 'offers')
+ADDRESS_KEYS = ('formattedAddress', 'fullAddress', 'streetAddress', 'address', 'location')
+BEDS_KEYS = ('bedRange', 'bedsRange', 'bedroomText', 'beds', 'bedrooms', 'numberOfBedrooms')
+BATHS_KEYS = ('bathRange', 'bathsRange', 'bathroomText', 'baths', 'bathrooms', 'numberOfBathroomsTotal')
+URL_KEYS = ('listingUrl', 'propertyUrl', 'detailUrl', 'url', 'href', 'link')
+
+# Captured listings replace the DOM cards only if there are at least this many, and at least this
+# share of the cards the DOM shows - a stray ad or analytics payload with a price is not a results page
+MIN_LISTINGS = 3
+MIN_CARD_SHARE = 0.5
+
+
+
+def drain_log(driver):
+    """Discard buffered performance-log entries (call before navigating)"""
+    try:
+        driver.get_log('performance')
+    except (WebDriverException, ValueError):
+        pass
+
+
+def json_responses(driver):
+    """Bodies of the JSON XHR/fetch responses logged since the last drain, decoded"""
+    try:
+        entries = driver.get_log('performance')
+    except (WebDriverException, ValueError):
+        return []
+    request_ids = []
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params', {})
+        response = params.get('response', {})
+        if response.get('status') != 200:
+            continue
+        if params.get('type') in CAPTURE_RESOURCE_TYPES or 'json' in (response.get('mimeType') or ''):
+            request_ids.append(params.get('requestId'))
+
+    payloads = []
+    for request_id in request_ids:
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            continue  # evicted from Chrome's buffer, or never had a body
+        text = body.get('body') or ''
+        try:
+            if body.get('base64Encoded'):
+                text = base64.b64decode(text).decode('utf-8', errors='replace')
+            if len(text) > MAX_BODY_BYTES:
+                continue
+            payloads.append(json.loads(text))
+        except (binascii.Error, ValueError):
+            continue
+    return payloads
+
+
+def inline_payloads(root):
+    """JSON embedded in the page itself (ld+json and application/json script blocks)"""
+    payloads = []
+    for script in root.xpath('//script[@type="application/ld+json" or @type="application/json"]'):
+        try:
+            payloads.append(json.loads(script.text or ''))
+        except ValueError:
+            continue
+    return payloads
+
+
+def _lookup(record, keys):
+    lowered = {key.lower(): value for key, value in record.items()}
+    for key in keys:
+        value = lowered.get(key.lower())
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+
+def _money(value):
+    return f"${value:,.0f}" if isinstance(value, (int, float)) else str(value)
+
+
+def _count(value, unit):
+    """2 -> '2 Beds' / '1 bath'; 0 beds is a studio"""
+    if unit == 'Bed' and value == 0:
+        return "Studio"
+    return f"{value:g} {unit}{'' if value == 1 else 's'}"
+
+
+def _format_range(value, unit=None, money=False):
+    """Card-style text ('$3,127 - $9,000', 'Studio - 2 Beds', '1-2 baths') from a number,
+    string, [min, max] list or {min, max} dict (schema.org offers included)"""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        low = _lookup(value, ('min', 'minimum', 'low', 'from', 'minValue', 'lowPrice'))
+        high = _lookup(value, ('max', 'maximum', 'high', 'to', 'maxValue', 'highPrice'))
+        if low is None and high is None:
+            value = _lookup(value, ('value', 'price', 'text', 'formatted', 'name'))
+            return None if value is None else _format_range(value, unit, money)
+        value = [v for v in (low, high) if v is not None]
+    if isinstance(value, list):
+        values = [v for v in value if v is not None and not isinstance(v, bool)]
+        if not values:
+            return None
+        numbers = all(isinstance(v, (int, float)) for v in values)
+        if numbers and not money and unit and len(set(values)) > 1:
+            low, high = min(values), max(values)
+            if unit == 'Bed' and low == 0:
+                return f"Studio - {_count(high, unit)}"
+            return f"{low:g}-{high:g} {unit}s"
+        parts = []
+        for v in values:
+            part = _format_range(v, unit, money)
+            if part and part not in parts:
+                parts.append(part)
+        return " - ".join(parts) if parts else None
+    if isinstance(value, bool):
+        return None
+    if money:
+        return _money(value)
+    if isinstance(value, (int, float)):
+        return _count(value, unit) if unit else f"{value:g}"
+    return str(value).strip()
+
+
+def _format_address(value):
+    if isinstance(value, dict):
+        region = " ".join(str(value[key]).strip() for key in ('addressRegion', 'postalCode') if value.get(key))
+        parts = [str(value[key]).strip() for key in ('streetAddress', 'addressLocality') if value.get(key)]
+        parts += [region] if region else []
+        if parts:
+            return ", ".join(parts)
+        value = _lookup(value, ('formatted', 'full', 'line1', 'name'))
+    return None if value is None or isinstance(value, (list, dict)) else str(value).strip()
+
+
+def listing_from_record(record, base_url=extractor.BASE_URL):
+    """Map one JSON object onto the listing fields, or None if it doesn't look like a listing"""
+    price = _lookup(record, PRICE_KEYS)
+    address = _lookup(record, ADDRESS_KEYS)
+    url = _lookup(record, URL_KEYS)
+    if price is None or (address is None and url is None):
+        return None
+    listing = {
+        'Price': _format_range(price, money=True) or extractor.NOT_FOUND,
+        'Address': _format_address(address) or extractor.NOT_FOUND,
+        'Beds': _format_range(_lookup(record, BEDS_KEYS), unit='Bed') or extractor.NOT_FOUND,
+        'Baths': _format_range(_lookup(record, BATHS_KEYS), unit='bath') or extractor.NOT_FOUND,
+        'URL': extractor.NOT_FOUND,
+    }
+    if isinstance(url, str) and url.strip():
+        url = url.strip()
+        listing['URL'] = url if url.startswith('http') else f"{base_url}{url if url.startswith('/') else '/' + url}"
+    if listing['Baths'] == extractor.NOT_FOUND and listing['Beds'] != extractor.NOT_FOUND:
+        listing['Baths'] = extractor.estimate_baths(listing['Beds'])
+    if not listing['Price'].startswith('$') and any(char.isdigit() for char in listing['Price']):
+        listing['Price'] = '$' + listing['Price']
+    return listing
+
+
+def plausible(listings, dom_cards=0):
+    """Whether listings found in the JSON can stand in for the page's `dom_cards` listing cards"""
+    return len(listings) >= max(MIN_LISTINGS, dom_cards * MIN_CARD_SHARE)
+
+
+def extract_listings(payloads, base_url=extractor.BASE_URL):
+    """Every listing-shaped object anywhere in the payloads, de-duplicated by URL, in order"""
+    listings = []
+    seen = set()
+    pending = list(reversed(payloads))
+    while pending:
+        item = pending.pop()
+        if isinstance(item, list):
+            pending.extend(reversed(item))
+            continue
+        if not isinstance(item, dict):
+            continue
+        listing = listing_from_record(item, base_url)
+        if listing is not None and extractor.has_enough_data(listing):
+            key = listing['URL'] if listing['URL'] != extractor.NOT_FOUND else (listing['Address'], listing['Price'])
+            if key not in seen:
+                seen.add(key)
+                listings.append(listing)
+            continue
+        pending.extend(reversed([value for value in item.values() if isinstance(value, (list, dict))]))
+    return listings
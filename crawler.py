@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Multi-page search crawl over a bounded pool of Chrome sessions
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+import browser
+import capture
+import extractor
+
+DEFAULT_LOCATIONS = ['new-york-ny']
+DEFAULT_WORKERS = 1
+
+# Politeness (per domain)
+MAX_PER_DOMAIN = 4        # concurrent page loads against one host
+POLITENESS_DELAY = 1.0    # minimum seconds between page loads on one host
+POLITENESS_JITTER = 0.5   # extra random delay so workers don't fire in lockstep
+
+PageTask = namedtuple('PageTask', ['location', 'page', 'url'])
+
+
+def search_url(location, page=1):
+    """Apartments.com results URL for a location slug (e.g. 'new-york-ny', or with filters
+    'new-york-ny/2-bedrooms-under-3000') and page"""
+    if page <= 1:
+        return f"{extractor.BASE_URL}/{location}/"
+    return f"{extractor.BASE_URL}/{location}/{page}/"
+
+
+def page_task(location, page=1):
+    """Build the work item for one results page"""
+    return PageTask(location, page, search_url(location, page))
+
+
+def session_memory_mb(driver):
+    """Resident memory of a session's chromedriver + Chrome process tree in MB, or None"""
+    try:
+        import psutil  # imported on first check; only pools with a memory limit need it
+    except ImportError:  # memory-based session recycling is skipped without psutil
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(process.memory_info().rss for process in processes) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class BrowserPool:
+    """Fixed-size pool of reusable Chrome sessions, created lazily on first use.
+
+    Sessions are recycled (quit and later restarted) after max_pages_per_session
+    page loads or once their process tree exceeds max_memory_mb. With profile_root
+    each slot keeps its own persistent Chrome profile across restarts.
+    """
+
+    def __init__(self, size, driver_factory=browser.create_driver, max_pages_per_session=None,
+                 max_memory_mb=None, profile_root=None):
+        self.size = max(1, size)
+        self.driver_factory = driver_factory
+        self.max_pages_per_session = max_pages_per_session
+        self.max_memory_mb = max_memory_mb
+        self.profile_root = profile_root
+        self._idle = queue.Queue()
+        self._free_slots = list(range(self.size))
+        self._slots = {}
+        self._pages_served = {}
+        self._startup_times = {}
+        self._lock = threading.Lock()
+
+    def _start_session(self, slot):
+        start = time.perf_counter()
+        if self.profile_root:
+            profile_dir = os.path.join(os.path.abspath(self.profile_root), f"session-{slot}")
+            driver = self.driver_factory(browser.build_chrome_options(profile_dir=profile_dir))
+        else:
+            driver = self.driver_factory()
+        with self._lock:
+            self._slots[id(driver)] = slot
+            self._pages_served[id(driver)] = 0
+            self._startup_times[id(driver)] = time.perf_counter() - start
+        return driver
+
+    def take_startup_time(self, driver):
+        """Seconds Chrome took to start for this session, reported once (None afterwards)"""
+        with self._lock:
+            return self._startup_times.pop(id(driver), None)
+
+    def _take_slot(self):
+        with self._lock:
+            return self._free_slots.pop() if self._free_slots else None
+
+    def _return_slot(self, slot):
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def acquire(self):
+        """Take an idle session, starting a new one if the pool isn't full yet"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            slot = self._take_slot()
+            if slot is not None:
+                try:
+                    return self._start_session(slot)
+                except Exception:
+                    self._return_slot(slot)
+                    raise
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue  # a recycled session may have freed its slot meanwhile
+
+    def warm(self):
+        """Start every session up front so the first page doesn't pay Chrome's cold start"""
+        while True:
+            slot = self._take_slot()
+            if slot is None:
+                break
+            try:
+                driver = self._start_session(slot)
+            except Exception:
+                self._return_slot(slot)
+                raise
+            driver.get("about:blank")
+            self._idle.put(driver)
+
+    def _needs_recycle(self, driver):
+        if self.max_pages_per_session and self._pages_served.get(id(driver), 0) >= self.max_pages_per_session:
+            return True
+        if self.max_memory_mb:
+            memory_mb = session_memory_mb(driver)
+            if memory_mb is not None and memory_mb > self.max_memory_mb:
+                return True
+        return False
+
+    def release(self, driver):
+        """Return a healthy session to the pool, recycling it if it's worn out"""
+        with self._lock:
+            self._pages_served[id(driver)] = self._pages_served.get(id(driver), 0) + 1
+        if self._needs_recycle(driver):
+            self.discard(driver)
+        else:
+            self._idle.put(driver)
+
+    def discard(self, driver):
+        """Drop a session; the next acquire starts a fresh one in its slot"""
+        with self._lock:
+            slot = self._slots.pop(id(driver), None)
+            self._pages_served.pop(id(driver), None)
+            self._startup_times.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if slot is not None:
+            self._return_slot(slot)
+
+    def close(self):
+        """Quit every idle session"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DomainLimiter:
+    """Per-domain concurrency cap plus a minimum spacing between page loads"""
+
+    def __init__(self, max_concurrent=MAX_PER_DOMAIN, delay=POLITENESS_DELAY, jitter=POLITENESS_JITTER):
+        self.max_concurrent = max_concurrent
+        self.delay = delay
+        self.jitter = jitter
+        self._semaphores = {}
+        self._next_start = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the domain's slots, waiting out the politeness delay first"""
+        domain = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(domain, threading.BoundedSemaphore(self.max_concurrent))
+        semaphore.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start.get(domain, 0.0))
+                self._next_start[domain] = start_at + self.delay + random.uniform(0, self.jitter)
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+        finally:
+            semaphore.release()
+
+
+def empty_result(task):
+    """A page result with nothing found yet (see fetch_page)"""
+    return {'task': task, 'properties': [], 'selector': None, 'cards': 0,
+            'page_count': None, 'timings': {}, 'network': None, 'source': None, 'field_stats': {}, 'error': None}
+
+
+def fetch_page(pool, limiter, task, wait_timeout=browser.PAGE_WAIT_TIMEOUT, selectors=None,
+               fields=extractor.FIELDS, archive=None):
+    """Load one results page on a pooled session and extract the requested fields of its listings.
+
+    selectors (a selector_stats.SelectorStats) puts each site's proven selectors first and learns from the page.
+    archive (a page_archive.PageArchive) keeps the rendered HTML so the page can be re-parsed later.
+    """
+    result = empty_result(task)
+    timings = result['timings']
+    capturing = browser.network_capture_enabled()
+    payloads = []
+
+    phase_start = time.perf_counter()
+    try:
+        driver = pool.acquire()
+    except Exception as e:
+        result['error'] = f"Could not start browser: {e}"
+        return result
+    timings['acquire'] = time.perf_counter() - phase_start
+    startup = pool.take_startup_time(driver)
+    if startup is not None:
+        timings['browser_start'] = startup
+    try:
+        if capturing:
+            capture.drain_log(driver)
+        with limiter.slot(task.url):
+            phase_start = time.perf_counter()
+            driver.get(task.url)
+            timings['navigation'] = time.perf_counter() - phase_start
+        timings.update(browser.wait_for_results(driver, timeout=wait_timeout))
+        page_html = driver.execute_script("return document.documentElement.outerHTML")
+        result['network'] = browser.page_transfer_stats(driver)
+        if capturing:
+            payloads = capture.json_responses(driver)
+    except WebDriverException as e:
+        pool.discard(driver)
+        result['error'] = str(e).strip().splitlines()[0] if str(e).strip() else repr(e)
+        return result
+    except Exception as e:
+        # Anything else still must not leak the session or abort the crawl: the page just fails
+        pool.discard(driver)
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+    pool.release(driver)
+
+    # Archive and parse after releasing the session so the browser is never idle behind CPU work
+    if archive is not None:
+        phase_start = time.perf_counter()
+        timings['archived'] = archive.add(task, page_html) is not None
+        timings['archive'] = time.perf_counter() - phase_start
+    return parse_results(result, page_html, payloads if capturing else None, selectors, fields)
+
+
+def parse_results(result, page_html, payloads=None, selectors=None, fields=extractor.FIELDS):
+    """Fill in a page result from the rendered HTML of the page.
+
+    payloads (the JSON responses captured while it loaded) is None unless network capture was
+    on; then the site's structured data is used instead of the DOM cards when it is plausible
+    (capture.plausible). Also re-parses archived pages.
+    """
+    task = result['task']
+    timings = result['timings']
+    capturing = payloads is not None
+    phase_start = time.perf_counter()
+    root = extractor.parse_page(page_html)
+    result['page_count'] = extractor.find_page_count(root)
+    timings['parse'] = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
+    learned = selectors.page(urlparse(task.url).netloc) if selectors is not None else None
+    selector, cards = extractor.find_cards(root, max_cards=None, learned=learned)
+    timings['card_discovery'] = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
+    if capturing:
+        # The site's own JSON responses and inline JSON, when they hold the page's listings
+        listings = capture.extract_listings(payloads + capture.inline_payloads(root))
+        if fields != extractor.FIELDS:
+            listings = [{field: listing[field] for field in fields} for listing in listings]
+            listings = [listing for listing in listings if extractor.has_enough_data(listing)]
+        if capture.plausible(listings, len(cards) if selector else 0):
+            result['properties'] = listings
+    if result['properties']:
+        result['source'] = 'network'
+        result['cards'] = len(result['properties'])
+    else:
+        result['source'] = 'dom'
+        result['selector'] = selector
+        result['cards'] = len(cards)
+        for card in cards:
+            property_dict = extractor.extract_card(card, field_stats=result['field_stats'], learned=learned,
+                                                   fields=fields)
+            if extractor.has_enough_data(property_dict):
+                result['properties'].append(property_dict)
+    if learned is not None:
+        selectors.merge(learned)
+    timings['extraction'] = time.perf_counter() - phase_start
+    return result
+
+
+def next_pages(result, max_pages=0):
+    """Follow-up pages to queue after a page finished (max_pages=0 means no limit)"""
+    task = result['task']
+    if result['error'] or not result['cards']:
+        return []
+    page_count = result['page_count']
+    if page_count:
+        # The first page knows the whole range; later pages add nothing new
+        if task.page != 1:
+            return []
+        last = page_count if not max_pages else min(page_count, max_pages)
+        return [page_task(task.location, page) for page in range(2, last + 1)]
+    # No pager found: keep walking until a page comes back empty
+    if max_pages and task.page >= max_pages:
+        return []
+    return [page_task(task.location, task.page + 1)]
+
+
+def complete_locations(results):
+    """Locations whose every results page was fetched without error"""
+    by_location = {}
+    for result in results:
+        by_location.setdefault(result['task'].location, []).append(result)
+    complete = set()
+    for location, pages in by_location.items():
+        if any(result['error'] for result in pages):
+            continue
+        fetched = {result['task'].page for result in pages}
+        page_count = max((result['page_count'] or 0 for result in pages), default=0)
+        if page_count:
+            if fetched >= set(range(1, page_count + 1)):
+                complete.add(location)
+        elif any(not result['cards'] for result in pages):
+            # No pager: complete once the walk reached a page that came back empty
+            complete.add(location)
+    return complete
+
+
+def crawl(locations=None, max_pages=1, workers=DEFAULT_WORKERS, wait_timeout=browser.PAGE_WAIT_TIMEOUT,
+          limiter=None, on_page=None, pool=None, selectors=None, done=None, fields=extractor.FIELDS, archive=None,
+          stop=None):
+    """Crawl every results page of every location across `workers` Chrome sessions.
+
+    on_page(result) is called from the calling thread as each page finishes.
+    fields limits extraction to a subset of extractor.FIELDS.
+    selectors (a selector_stats.SelectorStats) is shared by every page so later pages use what earlier ones learned.
+    archive (a page_archive.PageArchive) gets the rendered HTML of every page.
+    done lists results of pages fetched earlier (e.g. from a checkpoint): they are not loaded again,
+    and the crawl picks up with the pages they lead to.
+    stop (a threading.Event) cancels the crawl: once it is set no more pages are started.
+    Returns the list of page results in completion order (pages in done are not included).
+    """
+    locations = locations or DEFAULT_LOCATIONS
+    limiter = limiter or DomainLimiter()
+    done = done or []
+    seen = {result['task'].url for result in done}
+    pending = deque(task for task in (page_task(location) for location in locations) if task.url not in seen)
+    seen.update(task.url for task in pending)
+    for result in done:
+        for task in next_pages(result, max_pages):
+            if task.url not in seen:
+                seen.add(task.url)
+                pending.append(task)
+    results = []
+
+    owns_pool = pool is None
+    pool = pool or BrowserPool(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            while pending or in_flight:
+                if stop is not None and stop.is_set():
+                    # Cancelled: let the pages already loading finish, start no more
+                    pending.clear()
+                    if not in_flight:
+                        break
+                # Backpressure: never queue more pages than there are workers to load them
+                while pending and len(in_flight) < workers:
+                    task = pending.popleft()
+                    in_flight.add(executor.submit(fetch_page, pool, limiter, task, wait_timeout, selectors, fields,
+                                                  archive))
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    results.append(result)
+                    if on_page:
+                        on_page(result)
+                    for task in next_pages(result, max_pages):
+                        if task.url not in seen:
+                            seen.add(task.url)
+                            pending.append(task)
+    finally:
+        if owns_pool:
+            pool.close()
+    return results
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Listing detail-page enrichment over async HTTP
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from urllib.parse import urlparse
+
+import httpx
+from lxml import etree, html as lxml_html
+
+import browser
+import extractor
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "detail_cache")
+
+# Connection pool and politeness
+MAX_CONNECTIONS = 8
+REQUEST_TIMEOUT = 20.0
+RATE_PER_HOST = 2.0          # requests per second, per host
+BURST_PER_HOST = 4
+
+# Retry policy for throttling, transient server errors and network failures
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Fields merged into each listing record
+DETAIL_FIELDS = ('Sqft', 'Units', 'Amenities', 'Latitude', 'Longitude')
+
+SQFT_SELECTORS = ['.sqftInfo', '.priceBedRangeInfo', '.detailsTextWrapper']
+AMENITY_SELECTORS = ['.amenityLabel', '.specInfo', '.combinedAmenitiesList li']
+UNIT_SELECTORS = ['.pricingGridItem', '.unitContainer']
+UNIT_NAME_SELECTORS = ['.modelName', '.unitColumn']
+UNIT_RENT_SELECTORS = ['.rentLabel', '.pricingColumn']
+UNIT_DETAIL_SELECTORS = ['.detailsTextWrapper', '.sqftColumn']
+
+_SQFT = re.compile(r'([\d,]+)\s*(?:-\s*([\d,]+)\s*)?sq\.?\s*ft', re.IGNORECASE)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate=RATE_PER_HOST, capacity=BURST_PER_HOST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    """On-disk detail pages keyed by URL, revalidated with ETag / Last-Modified"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.json'), os.path.join(self.cache_dir, key + '.html')
+
+    def get(self, url):
+        """(metadata, body) for a cached URL, or (None, None)"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, response):
+        meta_path, body_path = self._paths(url)
+        with open(body_path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        meta = {'url': url, 'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'), 'fetched_at': time.time()}
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+
+def endpoint_url(url, endpoint=None):
+    """Point apartments.com URLs at endpoint (or HOMEHUNT_DETAIL_ENDPOINT) for stub-server testing"""
+    endpoint = endpoint or os.environ.get('HOMEHUNT_DETAIL_ENDPOINT')
+    if endpoint and url.startswith(extractor.BASE_URL):
+        return endpoint.rstrip('/') + url[len(extractor.BASE_URL):]
+    return url
+
+
+def _first(root, selectors):
+    for selector in selectors:
+        found = root.cssselect(selector)
+        if found:
+            return found
+    return []
+
+
+def _json_ld(root):
+    """Every JSON-LD object on the page, flattened out of lists and @graph wrappers"""
+    objects = []
+    for script in root.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text or '')
+        except ValueError:
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                objects.append(item)
+                pending.extend(item.get('@graph', []))
+                pending.extend(value for value in item.values() if isinstance(value, dict))
+    return objects
+
+
+def _sqft_range(text):
+    match = _SQFT.search(text or '')
+    if not match:
+        return None
+    low = match.group(1).replace(',', '')
+    high = (match.group(2) or '').replace(',', '')
+    return f"{low}-{high} sq ft" if high and high != low else f"{low} sq ft"
+
+
+def parse_detail(page_html):
+    """Detail fields from one listing page; missing ones are "Not found" """
+    details = {field: extractor.NOT_FOUND for field in DETAIL_FIELDS}
+    try:
+        root = lxml_html.fromstring(page_html)
+    except (etree.ParserError, ValueError):
+        return details
+
+    for item in _json_ld(root):
+        geo = item.get('geo') if isinstance(item.get('geo'), dict) else item
+        try:
+            details['Latitude'] = float(geo['latitude'])
+            details['Longitude'] = float(geo['longitude'])
+            break
+        except (KeyError, TypeError, ValueError):
+            details['Latitude'] = details['Longitude'] = extractor.NOT_FOUND
+    if details['Latitude'] == extractor.NOT_FOUND:
+        latitude = root.xpath('//meta[@property="place:location:latitude"]/@content')
+        longitude = root.xpath('//meta[@property="place:location:longitude"]/@content')
+        if latitude and longitude:
+            try:
+                details['Latitude'] = float(latitude[0])
+                details['Longitude'] = float(longitude[0])
+            except ValueError:
+                details['Latitude'] = details['Longitude'] = extractor.NOT_FOUND
+
+    for element in _first(root, SQFT_SELECTORS):
+        sqft = _sqft_range(extractor.element_text(element))
+        if sqft:
+            details['Sqft'] = sqft
+            break
+
+    amenities = []
+    for element in _first(root, AMENITY_SELECTORS):
+        text = extractor.element_text(element)
+        if text and text not in amenities:
+            amenities.append(text)
+    if amenities:
+        details['Amenities'] = "; ".join(amenities)
+
+    units = []
+    for unit in _first(root, UNIT_SELECTORS):
+        parts = []
+        for selectors in (UNIT_NAME_SELECTORS, UNIT_RENT_SELECTORS, UNIT_DETAIL_SELECTORS):
+            found = _first(unit, selectors)
+            if found:
+                parts.append(extractor.element_text(found[0]))
+        if parts:
+            units.append(" | ".join(parts))
+    if units:
+        details['Units'] = "; ".join(units)
+    return details
+
+
+class DetailFetcher:
+    """Fetches detail pages over one pooled async client with per-host rate limits, retries and a cache"""
+
+    def __init__(self, cache=None, rate=RATE_PER_HOST, burst=BURST_PER_HOST, max_connections=MAX_CONNECTIONS,
+                 max_retries=MAX_RETRIES, endpoint=None, transport=None):
+        self.cache = cache if cache is not None else ResponseCache()
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.endpoint = endpoint
+        self._buckets = {}
+        self.stats = {'fetched': 0, 'revalidated': 0, 'stale': 0, 'retries': 0, 'failed': 0}
+        self.client = httpx.AsyncClient(
+            headers={'User-Agent': browser.USER_AGENT, 'Accept': 'text/html'},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=REQUEST_TIMEOUT, follow_redirects=True, transport=transport)
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def fetch(self, url):
+        """Page HTML for a listing URL (from cache when the server says 304), or None"""
+        request_url = endpoint_url(url, self.endpoint)
+        meta, cached_body = self.cache.get(request_url)
+        headers = {}
+        if meta and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        for attempt in range(self.max_retries + 1):
+            await self._bucket(request_url).acquire()
+            retry_after = None
+            try:
+                response = await self.client.get(request_url, headers=headers)
+            except httpx.TransportError:
+                response = None
+            else:
+                if response.status_code == 304 and cached_body is not None:
+                    self.stats['revalidated'] += 1
+                    return cached_body
+                if response.status_code == 200:
+                    self.stats['fetched'] += 1
+                    self.cache.put(request_url, response)
+                    return response.text
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+                retry_after = response.headers.get('retry-after')
+            if attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+        if cached_body is not None:
+            # Serve stale rather than nothing
+            self.stats['stale'] += 1
+            return cached_body
+        self.stats['failed'] += 1
+        return None
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+async def enrich_async(properties, fetcher=None, on_listing=None):
+    """Fetch every listing's detail page concurrently and merge DETAIL_FIELDS into its record"""
+    owns_fetcher = fetcher is None
+    fetcher = fetcher or DetailFetcher()
+
+    async def enrich_one(index, prop):
+        url = prop.get('URL')
+        if not url or url == extractor.NOT_FOUND:
+            return
+        try:
+            page_html = await fetcher.fetch(url)
+            details = parse_detail(page_html) if page_html is not None else None
+        except Exception:
+            # One bad detail page leaves only its own listing unenriched
+            fetcher.stats['failed'] += 1
+            details = None
+        if details is not None:
+            prop.update(details)
+        if on_listing:
+            on_listing(index, prop, details is not None)
+
+    try:
+        await asyncio.gather(*(enrich_one(i, prop) for i, prop in enumerate(properties)))
+    finally:
+        if owns_fetcher:
+            await fetcher.aclose()
+    return fetcher.stats
+
+
+def enrich(properties, on_listing=None, **fetcher_options):
+    """Synchronous entry point: enrich listing records in place; returns fetch stats"""
+
+    async def run():
+        fetcher = DetailFetcher(**fetcher_options)
+        try:
+            return await enrich_async(properties, fetcher, on_listing)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
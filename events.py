@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Structured progress events (one JSON object per line)
+import json
+import threading
+import time
+
+# Event types
+PHASE = "phase"          # stage change: message
+PAGE = "page"            # a results page finished: location, page, url, cards, properties, selector, source, timings, network
+PROPERTY = "property"    # one extracted listing: index, record
+CHANGE = "change"        # incremental mode: kind (new/changed/removed), key, record, previous, price_delta
+SAVED = "saved"          # results written: filename (CSV), dataset (Parquet history), count, run_id
+SHEET = "sheet"          # Sheets upload finished: success, url, rows
+TIMINGS = "timings"      # run-level timings: timings
+METRICS = "metrics"      # run timing report written: path, report
+ERROR = "error"          # something failed: message
+DONE = "done"            # run finished: count, elapsed
+
+_stream = None
+_lock = threading.Lock()
+
+
+def configure(stream):
+    """Send events to `stream` (any text file object); None turns events off"""
+    global _stream
+    _stream = stream
+
+
+def enabled():
+    return _stream is not None
+
+
+def emit(event, **fields):
+    """Write one event line if an event stream is configured"""
+    if _stream is None:
+        return
+    fields['event'] = event
+    fields['ts'] = time.time()
+    line = json.dumps(fields, default=str, ensure_ascii=False)
+    with _lock:
+        _stream.write(line + "\n")
+        _stream.flush()
+
+
+def parse(line):
+    """Decode one event line; returns None for anything that isn't an event"""
+    line = line.strip()
+    if not line.startswith('{'):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and 'event' in event else None
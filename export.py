@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Streamed NDJSON/CSV exports of the listing store, compressed on the fly
+import csv
+import hashlib
+import io
+import json
+import zlib
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the brotli package is installed
+    brotli = None
+
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+COLUMNS = ['Price', 'Address', 'Beds', 'Baths', 'URL', 'Building ID', 'run_id', 'scraped_at', 'location']
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Rows per chunk handed to the compressor and the socket
+CHUNK_ROWS = 200
+
+
+def encodings():
+    """Content codings this server can produce, preferred first"""
+    return (['br'] if brotli is not None else []) + ['gzip']
+
+
+def negotiate(accept_encoding):
+    """Best coding for an Accept-Encoding header ('br', 'gzip' or 'identity')"""
+    offered = {}
+    for part in (accept_encoding or "").split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for coding in encodings():
+        if offered.get(coding, offered.get('*', 0)) > 0:
+            return coding
+    return 'identity'
+
+
+def etag(version, fmt, coding, params):
+    """Strong validator for one export: the store version plus everything that shapes the body"""
+    key = json.dumps([version, fmt, coding, sorted(params)], default=str)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def _ndjson(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def body(records, fmt, coding='identity', chunk_rows=CHUNK_ROWS):
+    """Encoded chunks of an export; `records` is consumed lazily, so memory stays at one chunk"""
+    lines = _csv(records) if fmt == 'csv' else _ndjson(records)
+    if coding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    elif coding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    else:
+        compress = flush = finish = None
+    pending = []
+    for line in lines:
+        pending.append(line)
+        if len(pending) >= chunk_rows:
+            data = "".join(pending).encode('utf-8')
+            pending = []
+            # Flushed per chunk so a client sees rows as they are read, not only at the end
+            yield compress(data) + flush() if compress else data
+    data = "".join(pending).encode('utf-8')
+    yield compress(data) + finish() if compress else data
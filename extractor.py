@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Single-pass listing extraction from rendered page HTML
+import re
+import time
+from itertools import islice
+from urllib.parse import urljoin
+
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+BASE_URL = "https://www.apartments.com"
+NOT_FOUND = "Not found"
+MAX_CARDS = 15
+# The div fallback (no card selector matched) only looks at the first FALLBACK_DIVS divs,
+# and keeps at most FALLBACK_CARDS of them
+FALLBACK_DIVS = 100
+FALLBACK_CARDS = 10
+
+# Record fields, in output order; runs can ask for a subset (the web UI's field checkboxes)
+FIELDS = ('Price', 'Address', 'Beds', 'Baths', 'URL')
+
+# Selector fallbacks, tried in order (same lists the live WebDriver path used)
+CARD_SELECTORS = [
+    '.placard',
+    '.property-wrap',
+    '.listing-item',
+    '.result-item',
+    '[data-testid="property-card"]',
+    '.rentals-results .property',
+    '.property-card',
+    '.listing-result',
+    '[class*="property"]',
+    '[class*="listing"]'
+]
+
+PRICE_SELECTORS = [
+    ".//*[contains(@class, 'price')]",
+    ".//*[contains(@class, 'rent')]",
+    ".//*[contains(text(), '$')]",
+    ".//span[contains(text(), '$')]",
+    ".//div[contains(text(), '$')]",
+    './/*[@data-testid*="price"]'
+]
+
+ADDRESS_SELECTORS = [
+    ".//*[contains(@class, 'address')]",
+    ".//*[contains(@class, 'location')]",
+    ".//*[contains(text(), 'NY')]",
+    ".//*[contains(text(), 'Street')]",
+    ".//*[contains(text(), 'Ave')]",
+    ".//*[contains(text(), 'Blvd')]",
+    ".//*[contains(text(), 'Road')]",
+    './/*[@data-testid*="address"]'
+]
+
+BED_SELECTORS = [
+    ".//*[contains(@class, 'bed')]",
+    ".//*[contains(@class, 'bedroom')]",
+    ".//*[contains(text(), 'bed')]",
+    ".//*[contains(text(), 'bd')]",
+    ".//*[contains(text(), 'studio')]",
+    ".//*[contains(text(), 'br')]"
+]
+
+URL_SELECTORS = [
+    ".//a[contains(@href, '/')]",
+    ".//a",
+    ".//*[@href]"
+]
+
+BATH_PATTERNS = [
+    r'(\d+(?:\.\d+)?)\s*bath(?:s|room)?',
+    r'(\d+(?:\.\d+)?)\s*ba\b',
+    r'(\d+(?:\.\d+)?)\s*bathroom'
+]
+
+ADDRESS_KEYWORDS = ['ny', 'street', 'ave', 'blvd', 'road', 'dr', 'new york']
+BED_KEYWORDS = ['bed', 'bd', 'studio', 'bedroom', 'br']
+
+
+def select_fields(names=None):
+    """Record fields for names like the UI's ['price', 'url'], in FIELDS order; None or empty means all"""
+    if not names:
+        return FIELDS
+    wanted = {name.strip().lower() for name in names}
+    unknown = wanted - {field.lower() for field in FIELDS}
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return tuple(field for field in FIELDS if field.lower() in wanted)
+
+
+def _compile_xpaths(selectors):
+    """Compile XPath selectors into (selector, xpath) pairs, dropping any that are invalid (they could never match)"""
+    compiled = []
+    for selector in selectors:
+        try:
+            compiled.append((selector, etree.XPath(selector)))
+        except etree.XPathSyntaxError:
+            continue
+    return compiled
+
+
+# Compile everything once at import so per-card work is pure tree walking
+_CARD_MATCHERS = [(selector, CSSSelector(selector)) for selector in CARD_SELECTORS]
+_PRICE_XPATHS = _compile_xpaths(PRICE_SELECTORS)
+_ADDRESS_XPATHS = _compile_xpaths(ADDRESS_SELECTORS)
+_BED_XPATHS = _compile_xpaths(BED_SELECTORS)
+_URL_XPATHS = _compile_xpaths(URL_SELECTORS)
+_BATH_REGEXES = [re.compile(pattern) for pattern in BATH_PATTERNS]
+_WHITESPACE = re.compile(r'\s+')
+_PAGE_RANGE = re.compile(r'page\s+\d+\s+of\s+(\d+)', re.IGNORECASE)
+_PAGING_LINKS = CSSSelector('#paging a, .paging a, nav[class*="pagination"] a')
+_PAGE_RANGE_TEXT = CSSSelector('.pageRange, [class*="pageRange"]')
+
+
+def parse_page(page_html):
+    """Parse rendered page HTML (e.g. driver.page_source) into an lxml tree"""
+    return lxml_html.fromstring(page_html)
+
+
+def element_text(element):
+    """Visible-ish text of an element, whitespace collapsed like WebDriver's .text"""
+    return _WHITESPACE.sub(' ', element.text_content()).strip()
+
+
+def _first_accepted(card, kind, xpaths, accept, learned=None):
+    """accept() applied to the first element each XPath matches, in selector order, until one
+    returns a value. With learned (a selector_stats.PageSelectors), proven selectors go first
+    and every attempt is recorded.
+    """
+    if learned is None:
+        for _, xpath in xpaths:
+            matches = xpath(card)
+            if matches:
+                value = accept(matches[0])
+                if value is not None:
+                    return value
+        return NOT_FOUND
+    for selector, xpath in learned.order(kind, xpaths):
+        start = time.perf_counter()
+        matches = xpath(card)
+        value = accept(matches[0]) if matches else None
+        learned.record(kind, selector, value is not None, time.perf_counter() - start)
+        if value is not None:
+            return value
+    return NOT_FOUND
+
+
+def find_cards(root, max_cards=MAX_CARDS, learned=None):
+    """Find property cards using the card selector fallbacks.
+
+    Returns (selector, cards); selector is None when the div fallback was used.
+    """
+    matchers = learned.order('card', _CARD_MATCHERS) if learned is not None else _CARD_MATCHERS
+    for selector, matcher in matchers:
+        start = time.perf_counter()
+        cards = matcher(root)
+        if learned is not None:
+            learned.record('card', selector, bool(cards), time.perf_counter() - start)
+        if cards:
+            return selector, cards[:max_cards] if max_cards else cards
+
+    # Fallback: any of the first FALLBACK_DIVS divs with property-like content
+    cards = []
+    for div in islice(root.iter('div'), FALLBACK_DIVS):
+        if len(cards) >= FALLBACK_CARDS:
+            break
+        text = element_text(div)
+        if '$' in text and ('bed' in text.lower() or 'bath' in text.lower() or 'br' in text.lower()):
+            cards.append(div)
+    return None, cards
+
+
+def find_page_count(root):
+    """Number of result pages advertised by the pager, or None if there is no pager"""
+    for elem in _PAGE_RANGE_TEXT(root):
+        match = _PAGE_RANGE.search(element_text(elem))
+        if match:
+            return int(match.group(1))
+    pages = [int(text) for text in (element_text(a) for a in _PAGING_LINKS(root)) if text.isdigit()]
+    return max(pages) if pages else None
+
+
+def _accept_price(elem):
+    price_text = element_text(elem)
+    return price_text if '$' in price_text and len(price_text) > 1 else None
+
+
+def _accept_address(elem):
+    addr_text = element_text(elem)
+    return addr_text if any(word in addr_text.lower() for word in ADDRESS_KEYWORDS) else None
+
+
+def _accept_beds(elem):
+    bed_text = element_text(elem)
+    return bed_text if any(word in bed_text.lower() for word in BED_KEYWORDS) else None
+
+
+def extract_price(card, learned=None):
+    """Extract the rent/price text from a card"""
+    return _first_accepted(card, 'price', _PRICE_XPATHS, _accept_price, learned)
+
+
+def extract_address(card, learned=None):
+    """Extract the street address text from a card"""
+    return _first_accepted(card, 'address', _ADDRESS_XPATHS, _accept_address, learned)
+
+
+def extract_beds(card, learned=None):
+    """Extract the bedroom text from a card"""
+    return _first_accepted(card, 'beds', _BED_XPATHS, _accept_beds, learned)
+
+
+def estimate_baths(beds):
+    """Estimate bathrooms from the bedroom text when the card doesn't list them"""
+    bed_text = beds.lower()
+    if 'studio' in bed_text:
+        return "1 bath"
+    elif '1' in bed_text:
+        return "1 bath"
+    elif '2' in bed_text:
+        return "1-2 baths"
+    elif '3' in bed_text:
+        return "2 baths"
+    elif '4' in bed_text:
+        return "2-3 baths"
+    return "2+ baths"
+
+
+def extract_baths(card, beds=NOT_FOUND, card_text=None):
+    """Extract bathrooms from the card text, falling back to an estimate from beds"""
+    if card_text is None:
+        card_text = element_text(card)
+    card_text = card_text.lower()
+    for regex in _BATH_REGEXES:
+        bath_match = regex.search(card_text)
+        if bath_match:
+            return bath_match.group(0)
+    if beds != NOT_FOUND:
+        return estimate_baths(beds)
+    return NOT_FOUND
+
+
+def extract_url(card, base_url=BASE_URL, learned=None):
+    """Extract the listing URL from a card, resolved against base_url"""
+
+    def accept(elem):
+        href = elem.get('href')
+        if not href:
+            return None
+        href = urljoin(base_url + '/', href.strip())
+        return href if href.startswith('http') else NOT_FOUND
+
+    return _first_accepted(card, 'url', _URL_XPATHS, accept, learned)
+
+
+def extract_card(card, base_url=BASE_URL, field_stats=None, learned=None, fields=FIELDS):
+    """Extract the requested fields (all by default) from a single card element.
+
+    Fields that aren't requested are never probed. Pass a dict as field_stats to accumulate
+    per-field [seconds, calls, misses], and a selector_stats.PageSelectors as learned to try
+    each site's proven selectors first.
+    """
+    if field_stats is not None or fields != FIELDS:
+        return _extract_fields(card, base_url, field_stats, learned, fields)
+    beds = extract_beds(card, learned)
+    return {
+        'Price': extract_price(card, learned),
+        'Address': extract_address(card, learned),
+        'Beds': beds,
+        'Baths': extract_baths(card, beds),
+        'URL': extract_url(card, base_url, learned)
+    }
+
+
+def _extract_fields(card, base_url, field_stats, learned, fields):
+    property_dict = {}
+    for field in fields:
+        start = time.perf_counter()
+        if field == 'Price':
+            value = extract_price(card, learned)
+        elif field == 'Address':
+            value = extract_address(card, learned)
+        elif field == 'Beds':
+            value = extract_beds(card, learned)
+        elif field == 'Baths':
+            value = extract_baths(card, property_dict.get('Beds', NOT_FOUND))
+            if value == NOT_FOUND and 'Beds' not in property_dict:
+                # The estimate from the bedroom text is still part of Baths when Beds wasn't asked for
+                beds = extract_beds(card, learned)
+                value = estimate_baths(beds) if beds != NOT_FOUND else NOT_FOUND
+        else:
+            value = extract_url(card, base_url, learned)
+        if field_stats is not None:
+            stats = field_stats.setdefault(field, [0.0, 0, 0])
+            stats[0] += time.perf_counter() - start
+            stats[1] += 1
+            stats[2] += value == NOT_FOUND
+        property_dict[field] = value
+    return property_dict
+
+
+def has_enough_data(property_dict, minimum=2):
+    """Include a property only if at least `minimum` fields were found (all of them, for records with fewer fields)"""
+    minimum = min(minimum, len(property_dict))
+    data_count = 0
+    for value in property_dict.values():
+        if value != NOT_FOUND and value.strip():
+            data_count += 1
+    return data_count >= minimum
+
+
+def extract_listings(page_html, base_url=BASE_URL, max_cards=MAX_CARDS, learned=None, fields=FIELDS):
+    """Parse a whole results page in one pass and return the usable listings"""
+    root = parse_page(page_html)
+    _, cards = find_cards(root, max_cards=max_cards, learned=learned)
+    properties = []
+    for card in cards:
+        property_dict = extract_card(card, base_url, learned=learned, fields=fields)
+        if has_enough_data(property_dict):
+            properties.append(property_dict)
+    return properties
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Local stub of apartments.com listing pages for offline enrichment testing
+import argparse
+import hashlib
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+FAKE_HOST = "127.0.0.1"
+FAKE_PORT = 8767
+
+AMENITIES = ["Washer/Dryer", "Dishwasher", "Fitness Center", "Roof Deck", "Doorman", "Pet Friendly", "Elevator"]
+
+
+def listing_page(path):
+    """Deterministic detail page for a listing path: JSON-LD geo, amenities and a unit pricing grid"""
+    seed = zlib.crc32(path.encode('utf-8'))
+    latitude = 40.70 + (seed % 1000) / 10000
+    longitude = -74.00 + (seed // 1000 % 1000) / 10000
+    amenities = "".join(f'<li><span class="amenityLabel">{AMENITIES[(seed + i) % len(AMENITIES)]}</span></li>'
+                        for i in range(3))
+    units = "".join(
+        f'<div class="pricingGridItem"><span class="modelName">{beds} Bed</span>'
+        f'<span class="rentLabel">${2000 + beds * 650 + seed % 300:,}</span>'
+        f'<span class="detailsTextWrapper">{beds} bd, 1 ba, {500 + beds * 250} sq ft</span></div>'
+        for beds in range(1, 3))
+    return (
+        '<!DOCTYPE html><html><head><title>Listing</title>'
+        '<script type="application/ld+json">'
+        f'{{"@context": "https://schema.org", "@type": "ApartmentComplex", '
+        f'"geo": {{"@type": "GeoCoordinates", "latitude": {latitude:.5f}, "longitude": {longitude:.5f}}}}}'
+        '</script></head><body>'
+        f'<div class="priceBedRangeInfo">1 - 2 Beds, 750 - 1,000 sq ft</div>'
+        f'<ul class="combinedAmenitiesList">{amenities}</ul>'
+        f'{units}</body></html>'
+    )
+
+
+class FakeListings:
+    """Counts requests; the first `fail_requests` requests answer 429"""
+
+    def __init__(self, fail_requests=0):
+        self.fail_requests = fail_requests
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def respond(self, path, if_none_match):
+        """(status, headers, body) for one GET"""
+        with self.lock:
+            self.requests += 1
+            if self.fail_requests > 0:
+                self.fail_requests -= 1
+                return 429, {'Retry-After': '0'}, b''
+        body = listing_page(path).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if if_none_match == etag:
+            with self.lock:
+                self.not_modified += 1
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'}, body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, headers, body = self.server.listings.respond(urlparse(self.path).path,
+                                                             self.headers.get('If-None-Match'))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_listings(host=FAKE_HOST, port=0, fail_requests=0):
+    """Run a stub listing server in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.listings = FakeListings(fail_requests)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of apartments.com listing detail pages")
+    parser.add_argument("--port", type=int, default=FAKE_PORT)
+    parser.add_argument("--fail-requests", type=int, default=0, help="Answer the first N requests with 429")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((FAKE_HOST, args.port), _Handler)
+    server.listings = FakeListings(args.fail_requests)
+    print(f"🧪 Stub listing pages on http://{FAKE_HOST}:{args.port}")
+    print(f"   Run enrichment with HOMEHUNT_DETAIL_ENDPOINT=http://{FAKE_HOST}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
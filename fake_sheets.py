@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Local fake of the Google Sheets API for offline upload testing
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+FAKE_HOST = "127.0.0.1"
+FAKE_PORT = 8766
+
+_SPREADSHEET = re.compile(r'^/v4/spreadsheets/([^/:]+)$')
+_APPEND = re.compile(r'^/v4/spreadsheets/([^/:]+)/values/(.+):append$')
+
+
+class FakeSheets:
+    """In-memory spreadsheets; the first `fail_appends` append calls answer 429"""
+
+    def __init__(self, fail_appends=0):
+        self.fail_appends = fail_appends
+        self.rows = {}
+        self.append_requests = 0
+        self.lock = threading.Lock()
+
+    def metadata(self, spreadsheet_id):
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "properties": {"title": f"HomeHunt fake {spreadsheet_id}", "locale": "en_US", "timeZone": "UTC"},
+            "sheets": [{"properties": {"sheetId": 0, "title": "Sheet1", "index": 0, "sheetType": "GRID",
+                                       "gridProperties": {"rowCount": 1000, "columnCount": 26}}}],
+        }
+
+    def append(self, spreadsheet_id, range_name, values):
+        """Record an append; returns (status, body)"""
+        with self.lock:
+            self.append_requests += 1
+            if self.fail_appends > 0:
+                self.fail_appends -= 1
+                return 429, {"error": {"code": 429, "message": "Quota exceeded (fake)", "status": "RESOURCE_EXHAUSTED"}}
+            sheet_rows = self.rows.setdefault(spreadsheet_id, [])
+            start = len(sheet_rows) + 1
+            sheet_rows.extend(values)
+        return 200, {
+            "spreadsheetId": spreadsheet_id,
+            "tableRange": range_name,
+            "updates": {"spreadsheetId": spreadsheet_id, "updatedRange": f"Sheet1!A{start}",
+                        "updatedRows": len(values), "updatedCells": sum(len(row) for row in values)},
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        match = _SPREADSHEET.match(urlparse(self.path).path)
+        if not match:
+            return self._reply(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+        self._reply(200, self.server.sheets.metadata(match.group(1)))
+
+    def do_POST(self):
+        match = _APPEND.match(urlparse(self.path).path)
+        if not match:
+            return self._reply(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        status, reply = self.server.sheets.append(match.group(1), unquote(match.group(2)), body.get('values', []))
+        self._reply(status, reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_sheets(host=FAKE_HOST, port=0, fail_appends=0):
+    """Run a fake Sheets server in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.sheets = FakeSheets(fail_appends)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Google Sheets API")
+    parser.add_argument("--port", type=int, default=FAKE_PORT)
+    parser.add_argument("--fail-appends", type=int, default=0, help="Answer the first N appends with 429")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((FAKE_HOST, args.port), _Handler)
+    server.sheets = FakeSheets(args.fail_appends)
+    print(f"🧪 Fake Sheets API on http://{FAKE_HOST}:{args.port}")
+    print(f"   Run uploads with HOMEHUNT_SHEETS_ENDPOINT=http://{FAKE_HOST}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Partitioned Parquet history of every run (date/city, zstd)
+import argparse
+import glob
+import os
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # history falls back to per-run CSV files without pyarrow
+    pa = None
+
+import normalize
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "listing_history")
+COMPRESSION = "zstd"
+UNKNOWN_CITY = "unknown"
+PARTITION_COLUMNS = ["date", "city"]
+# Filled in by detail-page enrichment (main.py --enrich); null for other runs
+DETAIL_COLUMNS = ["Sqft", "Units", "Amenities", "Latitude", "Longitude"]
+
+if pa is not None:
+    # Stable schema: every file in the dataset has exactly these columns and types
+    SCHEMA = pa.schema([
+        ("run_id", pa.string()),
+        ("scraped_at", pa.timestamp("us", tz="UTC")),
+        ("Price", pa.string()),
+        ("Address", pa.string()),
+        ("Beds", pa.string()),
+        ("Baths", pa.string()),
+        ("URL", pa.string()),
+        ("building_id", pa.string()),
+        ("Sqft", pa.string()),
+        ("Units", pa.string()),
+        ("Amenities", pa.string()),
+        ("Latitude", pa.float64()),
+        ("Longitude", pa.float64()),
+        ("rent_min", pa.int32()),
+        ("rent_max", pa.int32()),
+        ("beds_min", pa.int8()),
+        ("beds_max", pa.int8()),
+        ("baths_min", pa.float32()),
+        ("baths_max", pa.float32()),
+        ("date", pa.string()),
+        ("city", pa.string()),
+    ])
+    PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("city", pa.string())]), flavor="hive")
+
+
+def available():
+    return pa is not None
+
+
+def build_table(properties, run_id, scraped_at=None, locations=None):
+    """Arrow table of one run's listings, normalized and shaped to SCHEMA"""
+    scraped_at = scraped_at or time.time()
+    df = pd.DataFrame(list(properties), columns=["Price", "Address", "Beds", "Baths", "URL", "Building ID"] + DETAIL_COLUMNS)
+    df = df.rename(columns={"Building ID": "building_id"})
+    df = normalize.normalize(df)
+    for column in normalize.RAW_COLUMNS:
+        df[column] = df[column].astype(object)
+    for column in ("Latitude", "Longitude"):
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    df["run_id"] = run_id
+    df["scraped_at"] = pd.Timestamp(scraped_at, unit="s", tz="UTC").floor("us")
+    df["date"] = datetime.fromtimestamp(scraped_at, timezone.utc).strftime("%Y-%m-%d")
+    df["city"] = [location or UNKNOWN_CITY for location in locations] if locations else UNKNOWN_CITY
+    return pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+
+
+def append_run(properties, run_id, scraped_at=None, locations=None, base_dir=HISTORY_DIR):
+    """Add one run to the dataset as new files under date=/city= partitions; returns base_dir"""
+    table = build_table(properties, run_id, scraped_at, locations)
+    ds.write_dataset(
+        table, base_dir, format="parquet", partitioning=PARTITIONING,
+        basename_template=f"{run_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=COMPRESSION))
+    return base_dir
+
+
+def dataset(base_dir=HISTORY_DIR):
+    """The whole history as a pyarrow dataset (lazy; nothing is read yet)"""
+    return ds.dataset(base_dir, format="parquet", schema=SCHEMA, partitioning=PARTITIONING)
+
+
+def read(filters=None, columns=None, base_dir=HISTORY_DIR):
+    """Read matching rows, memory-mapped.
+
+    filters use pyarrow's DNF form, e.g. [("city", "=", "new-york-ny"), ("rent_max", "<=", 3000)].
+    date/city filters prune whole partitions; the rest are pushed down to row groups.
+    """
+    if not os.path.isdir(base_dir):
+        return SCHEMA.empty_table() if columns is None else SCHEMA.empty_table().select(columns)
+    return pq.read_table(base_dir, columns=columns, filters=filters, schema=SCHEMA,
+                         partitioning=PARTITIONING, memory_map=True)
+
+
+def import_csv(path, base_dir=HISTORY_DIR, city=UNKNOWN_CITY):
+    """Append one legacy apartments_properties_<timestamp>.csv as its own run"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    run_id = name.replace("apartments_properties_", "")
+    try:
+        scraped_at = time.mktime(time.strptime(run_id, "%Y%m%d_%H%M%S"))
+    except ValueError:
+        scraped_at = os.path.getmtime(path)
+    properties = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+    append_run(properties, run_id, scraped_at, [city] * len(properties), base_dir)
+    return run_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt Parquet listing history")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="Dataset directory (default: %(default)s)")
+    parser.add_argument("--import-csv", metavar="DIR", help="Import every apartments_properties_*.csv in DIR")
+    parser.add_argument("--city", default=UNKNOWN_CITY, help="City partition for imported CSV files")
+    args = parser.parse_args()
+
+    if not available():
+        print("❌ pyarrow is not installed (pip install pyarrow)")
+    elif args.import_csv:
+        files = sorted(glob.glob(os.path.join(args.import_csv, "apartments_properties_*.csv")))
+        for path in files:
+            import_csv(path, args.dir, args.city)
+            print(f"📥 Imported {os.path.basename(path)}")
+        print(f"✅ Imported {len(files)} CSV file(s) into {args.dir}")
+    else:
+        table = read(base_dir=args.dir)
+        print(f"📊 {table.num_rows} listings in {args.dir}")
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Scrape job registry, priority scheduler and SQLite persistence
+import collections
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from progress_feed import ProgressFeed
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "homehunt_jobs.db")
+SPILL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_results")
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_PRIORITY = 0          # higher runs first
+SAVE_INTERVAL = 2.0           # seconds between progress checkpoints while a job runs
+RECENT_PROPERTIES = 200       # listings kept in progress["properties"]; older ones go to the job's spill file
+LOG_LINES = 200               # recent log lines kept per job
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+ERROR = "error"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, ERROR, CANCELLED)
+
+
+def new_progress(message="Queued"):
+    """Fresh progress dict, same shape the web interface has always polled"""
+    return {
+        "status": QUEUED,
+        "current": 0,
+        "total": 0,
+        "message": message,
+        "properties": [],
+        "properties_start": 0,    # index of properties[0] among everything the job found
+        "property_count": 0,
+        "current_property": None,
+        "sheet_url": None,
+        "completed": False
+    }
+
+
+class Job:
+    """One scrape request: parameters, live progress and a feed for stream viewers"""
+
+    def __init__(self, params, priority=DEFAULT_PRIORITY, job_id=None, created_at=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.params = params
+        self.priority = priority
+        self.progress = new_progress()
+        self.feed = ProgressFeed()
+        self.feed.reset(self.progress)
+        self.created_at = created_at or time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.process = None
+        self.log = collections.deque(maxlen=LOG_LINES)
+        self._cancel = threading.Event()
+        self._last_saved = 0.0
+        self._properties_lock = threading.Lock()
+
+    @property
+    def status(self):
+        return self.progress["status"]
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def spill_path(self):
+        return os.path.join(SPILL_DIR, f"{self.id}.ndjson")
+
+    def add_property(self, record):
+        """Add a found listing, moving the oldest one to the spill file once the window is full"""
+        with self._properties_lock:
+            properties = self.progress["properties"]
+            properties.append(record)
+            self.progress["property_count"] += 1
+            if len(properties) > RECENT_PROPERTIES:
+                spilled = properties[:len(properties) - RECENT_PROPERTIES]
+                os.makedirs(SPILL_DIR, exist_ok=True)
+                with open(self.spill_path, 'ab') as f:
+                    f.writelines(_spill_line(item) for item in spilled)
+                del properties[:len(spilled)]
+                self.progress["properties_start"] += len(spilled)
+
+    def properties_page(self, cursor=None, limit=100):
+        """One page of every listing the job found, in order: (properties, next_cursor or None).
+
+        A cursor is "<index>.<byte offset of that listing in the spill file>", so each page
+        costs one seek. The spill file is append-only, so the offset of a listing still in
+        memory is known before it is written. Raises ValueError for a malformed cursor.
+        """
+        index, offset = (int(part) for part in cursor.split('.', 1)) if cursor else (0, 0)
+        if index < 0 or offset < 0:
+            raise ValueError(f"Bad cursor: {cursor}")
+        page = []
+        with self._properties_lock:
+            start = self.progress["properties_start"]
+            if index < start:
+                with open(self.spill_path, 'rb') as f:
+                    f.seek(offset)
+                    while index < start and len(page) < limit:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            raise ValueError(f"Bad cursor: {cursor}")
+                        page.append(json.loads(line))
+                        index += 1
+                        offset += len(line)
+            else:
+                offset = os.path.getsize(self.spill_path) if start else 0
+                offset += sum(len(_spill_line(item)) for item in self.progress["properties"][:index - start])
+            window = self.progress["properties"][max(index - start, 0):][:limit - len(page)]
+            page.extend(window)
+            index += len(window)
+            offset += sum(len(_spill_line(item)) for item in window)
+            count = self.progress["property_count"]
+        return page, (f"{index}.{offset}" if index < count else None)
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "params": self.params,
+            "message": self.progress["message"],
+            "current": self.progress["current"],
+            "total": self.progress["total"],
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+def _spill_line(record):
+    return (json.dumps(record, default=str) + "\n").encode('utf-8')
+
+
+class JobStore:
+    """SQLite table of jobs so queued and finished jobs survive a Flask restart"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    params TEXT NOT NULL,
+                    progress TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def save(self, job):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, priority, params, progress, created_at, started_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, job.priority, json.dumps(job.params), json.dumps(job.progress, default=str),
+                 job.created_at, job.started_at, job.finished_at))
+
+    def load_all(self):
+        """Rebuild Job objects from the table, oldest first"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, priority, params, progress, created_at, started_at, finished_at "
+                "FROM jobs ORDER BY created_at").fetchall()
+        loaded = []
+        for job_id, priority, params, progress, created_at, started_at, finished_at in rows:
+            job = Job(json.loads(params), priority, job_id=job_id, created_at=created_at)
+            job.progress.update(json.loads(progress))
+            if not job.progress["property_count"]:
+                # Saved before listings were counted separately
+                job.progress["property_count"] = len(job.progress["properties"])
+            job.feed.reset(job.progress)
+            job.started_at = started_at
+            job.finished_at = finished_at
+            loaded.append(job)
+        return loaded
+
+
+class JobManager:
+    """Runs jobs on a bounded pool of worker threads, highest priority first.
+
+    runner(job) does the actual work; it should watch job.cancelled, update
+    job.progress and call manager.publish(job) as progress changes.
+    on_finish(job), if given, is called once each job reaches a finished state.
+    """
+
+    def __init__(self, runner, max_workers=DEFAULT_MAX_WORKERS, store=None, on_finish=None):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.store = store
+        self.on_finish = on_finish
+        self.jobs = {}
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = []
+        if store is not None:
+            self._restore()
+
+    def _restore(self):
+        for job in self.store.load_all():
+            if job.status == RUNNING:
+                # The process driving it died with the old server
+                job.progress["status"] = ERROR
+                job.progress["message"] = "Interrupted by a server restart"
+                job.progress["completed"] = True
+                job.finished_at = job.finished_at or time.time()
+                job.feed.reset(job.progress)
+                self.store.save(job)
+            self.jobs[job.id] = job
+            if job.status == QUEUED:
+                self._enqueue(job)
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        return self
+
+    def _enqueue(self, job):
+        self._queue.put((-job.priority, next(self._order), job.id))
+
+    def submit(self, params, priority=DEFAULT_PRIORITY):
+        """Register and queue a new job; returns it"""
+        job = Job(params, priority)
+        with self._lock:
+            self.jobs[job.id] = job
+        self._save(job, force=True)
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def latest(self):
+        """Most recently created job, or None"""
+        with self._lock:
+            return max(self.jobs.values(), key=lambda job: job.created_at, default=None)
+
+    def counts(self):
+        """Number of jobs in each state"""
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def list(self):
+        with self._lock:
+            jobs = sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+        return [job.summary() for job in jobs]
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        job._cancel.set()
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED, "Cancelled before it started")
+        elif job.process is not None:
+            try:
+                job.process.kill()
+            except Exception:
+                pass
+        return True
+
+    def publish(self, job, force=False):
+        """Push a job's progress to its stream viewers and checkpoint it periodically"""
+        job.feed.update(job.progress)
+        self._save(job, force)
+
+    def _save(self, job, force=False):
+        if self.store is None:
+            return
+        now = time.time()
+        if force or now - job._last_saved >= SAVE_INTERVAL:
+            job._last_saved = now
+            self.store.save(job)
+
+    def _finish(self, job, status, message=None):
+        job.progress["status"] = status
+        if message:
+            job.progress["message"] = message
+        job.progress["completed"] = True
+        job.finished_at = time.time()
+        self.publish(job, force=True)
+        if self.on_finish:
+            try:
+                self.on_finish(job)
+            except Exception:
+                pass
+
+    def _work(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+            job.progress["status"] = RUNNING
+            job.progress["message"] = "Setting up Chrome browser..."
+            job.started_at = time.time()
+            self.publish(job, force=True)
+            try:
+                self.runner(job)
+            except Exception as e:
+                job.progress["status"] = ERROR
+                job.progress["message"] = f"Error: {e}"
+            if job.cancelled:
+                self._finish(job, CANCELLED, "Cancelled")
+            elif job.status == RUNNING:
+                self._finish(job, COMPLETED)
+            else:
+                self._finish(job, job.status)
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Persistent SQLite store of every scraped listing
+import argparse
+import base64
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+import addresses
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "homehunt_listings.db")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH = 500        # rows fetched at a time while streaming an export
+
+_RECORD_COLUMNS = "run_id, scraped_at, location, price, address, beds, baths, url, building_id"
+
+_PRICE_AMOUNT = re.compile(r'\$\s*([\d,]+)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    scraped_at REAL NOT NULL,
+    count INTEGER NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scraped_at ON runs (scraped_at);
+
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    location TEXT,
+    price TEXT,
+    price_min INTEGER,
+    price_max INTEGER,
+    address TEXT COLLATE NOCASE,
+    beds TEXT,
+    baths TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_listings_run ON listings (run_id, id);
+CREATE INDEX IF NOT EXISTS idx_listings_url ON listings (url);
+CREATE INDEX IF NOT EXISTS idx_listings_address ON listings (address COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price_min);
+CREATE INDEX IF NOT EXISTS idx_listings_scraped_at ON listings (scraped_at);
+
+CREATE TABLE IF NOT EXISTS listing_state (
+    listing_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    location TEXT,
+    price TEXT,
+    price_min INTEGER,
+    price_max INTEGER,
+    address TEXT,
+    beds TEXT,
+    baths TEXT,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_run_id TEXT,
+    removed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_state_location ON listing_state (location, removed_at);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY,
+    listing_key TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    changed_at REAL NOT NULL,
+    old_price TEXT,
+    new_price TEXT,
+    min_delta INTEGER,
+    max_delta INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_key ON price_history (listing_key, changed_at);
+
+CREATE TABLE IF NOT EXISTS buildings (
+    building_id TEXT NOT NULL,
+    block TEXT NOT NULL,
+    street TEXT NOT NULL,
+    address TEXT,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (block, street)
+);
+"""
+
+# Change kinds reported by track_changes
+NEW = "new"
+CHANGED = "changed"
+REMOVED = "removed"
+
+_FINGERPRINT_FIELDS = ('Price', 'Beds', 'Baths', 'Address')
+_NOT_FOUND = "Not found"
+
+def parse_price_range(price):
+    """('$3,127 - $9,000') -> (3127, 9000); (None, None) when there is no dollar amount"""
+    amounts = [int(amount.replace(',', '')) for amount in _PRICE_AMOUNT.findall(price or '') if amount.replace(',', '')]
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def listing_key(prop):
+    """Stable identity for a listing: its URL, or its address when the card had no link"""
+    url = prop.get('URL')
+    if url and url != _NOT_FOUND:
+        return url
+    address = (prop.get('Address') or '').strip().lower()
+    return f"address:{address}" if address and address != _NOT_FOUND.lower() else None
+
+
+def fingerprint(prop):
+    """Content hash of the fields that matter for change detection"""
+    content = "\x1f".join(str(prop.get(field) or '') for field in _FINGERPRINT_FIELDS)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _delta(new, old):
+    return None if new is None or old is None else new - old
+
+
+def _record(row):
+    run, scraped, location, price, address, beds, baths, url, building_id = row
+    return {'Price': price, 'Address': address, 'Beds': beds, 'Baths': baths, 'URL': url, 'Building ID': building_id,
+            'run_id': run, 'scraped_at': scraped, 'location': location}
+
+
+def _filters(run_id=None, url=None, address=None, min_price=None, max_price=None, beds=None,
+             since=None, until=None, building=None):
+    """SQL conditions and arguments for the query()/export() filters"""
+    clauses = []
+    args = []
+    if run_id:
+        clauses.append("run_id = ?")
+        args.append(run_id)
+    if url:
+        clauses.append("url = ?")
+        args.append(url)
+    if building:
+        clauses.append("building_id = ?")
+        args.append(building)
+    if address:
+        clauses.append("address LIKE ? ESCAPE '\\'")
+        args.append(address.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if min_price is not None:
+        clauses.append("price_max >= ?")
+        args.append(min_price)
+    if max_price is not None:
+        clauses.append("price_min <= ?")
+        args.append(max_price)
+    if beds:
+        clauses.append("beds LIKE ?")
+        args.append(f"%{beds}%")
+    if since is not None:
+        clauses.append("scraped_at >= ?")
+        args.append(since)
+    if until is not None:
+        clauses.append("scraped_at < ?")
+        args.append(until)
+    return clauses, args
+
+
+def encode_cursor(scraped_at, row_id):
+    """Opaque export cursor: the position just after (scraped_at, id) in newest-first order"""
+    return base64.urlsafe_b64encode(json.dumps([scraped_at, row_id]).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(scraped_at, id) from encode_cursor(); ValueError if it isn't one"""
+    try:
+        scraped_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(scraped_at), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Bad cursor: {cursor}") from e
+
+
+def new_run_id():
+    """Sortable, unique id for one scrape run"""
+    return time.strftime('%Y%m%d_%H%M%S') + '_' + uuid.uuid4().hex[:6]
+
+
+class ListingStore:
+    """Append-only listing history with indexes for URL, address, price and time lookups"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(listings)")]
+            if 'building_id' not in columns:
+                # Stores created before listings had building IDs
+                conn.execute("ALTER TABLE listings ADD COLUMN building_id TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_listings_building ON listings (building_id)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add_run(self, properties, run_id=None, scraped_at=None, locations=None, source=None):
+        """Write one run's listings in a single transaction; returns the run id"""
+        run_id = run_id or new_run_id()
+        scraped_at = scraped_at or time.time()
+        rows = []
+        for i, prop in enumerate(properties):
+            price_min, price_max = parse_price_range(prop.get('Price'))
+            rows.append((run_id, scraped_at, locations[i] if locations else None, prop.get('Price'),
+                         price_min, price_max, prop.get('Address'), prop.get('Beds'), prop.get('Baths'),
+                         prop.get('URL'), prop.get('Building ID')))
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO runs (run_id, scraped_at, count, source) VALUES (?, ?, ?, ?)",
+                         (run_id, scraped_at, len(rows), source))
+            conn.executemany(
+                "INSERT INTO listings (run_id, scraped_at, location, price, price_min, price_max, address, beds, baths, url, "
+                "building_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run_id
+
+    def latest_run_id(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT run_id FROM runs ORDER BY scraped_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def building_index(self):
+        """addresses.BuildingIndex of every building seen so far, so IDs stay the same across runs"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT block, street, building_id FROM buildings").fetchall()
+        return addresses.BuildingIndex(rows)
+
+    def save_buildings(self, index, seen_at=None):
+        """Record the buildings first seen since the index was loaded"""
+        seen_at = seen_at or time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO buildings (building_id, block, street, address, first_seen) VALUES (?, ?, ?, ?, ?)",
+                [(bid, block, street, address, seen_at) for bid, block, street, address in index.added])
+        index.added = []
+
+    def query(self, run_id=None, url=None, address=None, min_price=None, max_price=None, beds=None,
+              since=None, until=None, building=None, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """Filtered page of listings, newest first.
+
+        address matches as a case-insensitive prefix (index-backed); beds as a substring;
+        building is an exact Building ID. Returns (records, has_more).
+        """
+        clauses, args = _filters(run_id, url, address, min_price, max_price, beds, since, until, building)
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = (f"SELECT {_RECORD_COLUMNS} FROM listings {where} "
+               f"ORDER BY scraped_at DESC, id DESC LIMIT ? OFFSET ?")
+        with self._connect() as conn:
+            rows = conn.execute(sql, args + [limit + 1, max(0, int(offset))]).fetchall()
+        return [_record(row) for row in rows[:limit]], len(rows) > limit
+
+    def version(self):
+        """Changes whenever a listing is added (the table is append-only): the newest row id"""
+        with self._connect() as conn:
+            return conn.execute("SELECT MAX(id) FROM listings").fetchone()[0] or 0
+
+    def _keyset(self, filters, cursor):
+        clauses, args = _filters(**filters)
+        if cursor:
+            scraped_at, row_id = decode_cursor(cursor)
+            clauses.append("(scraped_at < ? OR (scraped_at = ? AND id < ?))")
+            args += [scraped_at, scraped_at, row_id]
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def export(self, filters=None, cursor=None, limit=None, batch=EXPORT_BATCH):
+        """Yield matching records newest first, after `cursor`, at most `limit` (None = all).
+
+        Rows are read `batch` at a time from one snapshot of the table, so memory use doesn't
+        depend on how many match. Raises ValueError for a bad cursor (before yielding anything).
+        """
+        where, args = self._keyset(filters or {}, cursor)
+        sql = f"SELECT {_RECORD_COLUMNS} FROM listings {where} ORDER BY scraped_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(max(0, int(limit)))
+        return self._stream(sql, args, batch)
+
+    def _stream(self, sql, args, batch):
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, args)
+            while True:
+                chunk = rows.fetchmany(batch)
+                if not chunk:
+                    break
+                for row in chunk:
+                    yield _record(row)
+        finally:
+            conn.close()
+
+    def next_cursor(self, filters=None, cursor=None, limit=None):
+        """Cursor for the page after export(filters, cursor, limit), or None if that page is the last"""
+        if limit is None:
+            return None
+        where, args = self._keyset(filters or {}, cursor)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT scraped_at, id FROM listings {where} ORDER BY scraped_at DESC, id DESC LIMIT 2 OFFSET ?",
+                args + [max(0, int(limit) - 1)]).fetchall()
+        return encode_cursor(*rows[0]) if len(rows) == 2 and limit > 0 else None
+
+    def track_changes(self, properties, run_id, scraped_at=None, locations=None, complete_locations=()):
+        """Compare a run against the last known state of each listing and record the differences.
+
+        Returns {'new': [...], 'changed': [...], 'removed': [...], 'unchanged': count}; each change
+        is {'kind', 'key', 'record', 'previous', 'price_delta'}. Listings are only reported as
+        removed for locations in complete_locations, i.e. where every results page was crawled.
+        """
+        scraped_at = scraped_at or time.time()
+        changes = {NEW: [], CHANGED: [], REMOVED: [], 'unchanged': 0}
+        columns = "fingerprint, price, price_min, price_max, address, beds, baths, url, removed_at"
+        seen = set()
+        with self._lock, self._connect() as conn:
+            for i, prop in enumerate(properties):
+                key = listing_key(prop)
+                if key is None:
+                    changes[NEW].append({'kind': NEW, 'key': None, 'record': prop, 'previous': None,
+                                         'price_delta': None})
+                    continue
+                if key in seen:
+                    continue
+                seen.add(key)
+                location = locations[i] if locations else None
+                row = conn.execute(f"SELECT {columns} FROM listing_state WHERE listing_key = ?", (key,)).fetchone()
+                current = prop
+                if row is not None:
+                    # A --fields run only compares (and updates) the fields it extracted
+                    stored = {'Price': row[1], 'Address': row[4], 'Beds': row[5], 'Baths': row[6], 'URL': row[7]}
+                    current = {**stored, **{field: prop[field] for field in stored if field in prop}}
+                digest = fingerprint(current)
+                price_min, price_max = parse_price_range(current.get('Price'))
+
+                if row is not None and row[0] == digest and row[8] is None:
+                    changes['unchanged'] += 1
+                    conn.execute("UPDATE listing_state SET last_seen = ?, last_run_id = ? WHERE listing_key = ?",
+                                 (scraped_at, run_id, key))
+                    continue
+
+                if row is None or row[8] is not None:
+                    # Never seen, or back after being removed
+                    kind, previous, price_delta = NEW, None, None
+                else:
+                    kind = CHANGED
+                    previous = {'Price': row[1], 'Address': row[4], 'Beds': row[5], 'Baths': row[6], 'URL': row[7]}
+                    price_delta = None
+                    if current.get('Price') != row[1]:
+                        price_delta = {'min': _delta(price_min, row[2]), 'max': _delta(price_max, row[3])}
+                        conn.execute(
+                            "INSERT INTO price_history (listing_key, run_id, changed_at, old_price, new_price, min_delta, max_delta) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (key, run_id, scraped_at, row[1], current.get('Price'), price_delta['min'], price_delta['max']))
+                changes[kind].append({'kind': kind, 'key': key, 'record': prop, 'previous': previous,
+                                      'price_delta': price_delta})
+                conn.execute(
+                    "INSERT INTO listing_state (listing_key, fingerprint, location, price, price_min, price_max, address, "
+                    "beds, baths, url, first_seen, last_seen, last_run_id, removed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL) "
+                    "ON CONFLICT (listing_key) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                    "location = COALESCE(excluded.location, location), price = excluded.price, "
+                    "price_min = excluded.price_min, price_max = excluded.price_max, address = excluded.address, "
+                    "beds = excluded.beds, baths = excluded.baths, url = excluded.url, last_seen = excluded.last_seen, "
+                    "last_run_id = excluded.last_run_id, removed_at = NULL",
+                    (key, digest, location, current.get('Price'), price_min, price_max, current.get('Address'),
+                     current.get('Beds'), current.get('Baths'), current.get('URL'), scraped_at, scraped_at, run_id))
+
+            for location in complete_locations:
+                gone = conn.execute(
+                    "SELECT listing_key, price, address, beds, baths, url FROM listing_state "
+                    "WHERE location = ? AND removed_at IS NULL AND (last_run_id IS NULL OR last_run_id != ?)",
+                    (location, run_id)).fetchall()
+                for key, price, address, beds, baths, url in gone:
+                    record = {'Price': price, 'Address': address, 'Beds': beds, 'Baths': baths, 'URL': url}
+                    changes[REMOVED].append({'kind': REMOVED, 'key': key, 'record': record, 'previous': record,
+                                             'price_delta': None})
+                conn.executemany("UPDATE listing_state SET removed_at = ? WHERE listing_key = ?",
+                                 [(scraped_at, key) for key, *_ in gone])
+        return changes
+
+    def price_history(self, key):
+        """Every recorded price change of one listing, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT run_id, changed_at, old_price, new_price, min_delta, max_delta FROM price_history "
+                "WHERE listing_key = ? ORDER BY changed_at, id", (key,)).fetchall()
+        return [{'run_id': run, 'changed_at': changed_at, 'old_price': old, 'new_price': new,
+                 'min_delta': min_delta, 'max_delta': max_delta}
+                for run, changed_at, old, new, min_delta, max_delta in rows]
+
+    def import_csv(self, path):
+        """Load one legacy apartments_properties_<timestamp>.csv as its own run"""
+        with open(path, newline='', encoding='utf-8') as f:
+            properties = list(csv.DictReader(f))
+        run_id = os.path.splitext(os.path.basename(path))[0].replace('apartments_properties_', '')
+        return self.add_run(properties, run_id=run_id, scraped_at=os.path.getmtime(path), source=os.path.basename(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt listing store")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--import-csv", metavar="DIR", help="Import every apartments_properties_*.csv in DIR")
+    args = parser.parse_args()
+
+    store = ListingStore(args.db)
+    if args.import_csv:
+        files = sorted(glob.glob(os.path.join(args.import_csv, "apartments_properties_*.csv")))
+        for path in files:
+            store.import_csv(path)
+            print(f"📥 Imported {os.path.basename(path)}")
+        print(f"✅ Imported {len(files)} CSV file(s) into {args.db}")
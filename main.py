@@ -2,22 +2,27 @@
 # HomeHunt Data Collector - Main Script using Apartments.com with Google Sheets Integration
 import sys
 import io
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 # Make sure output is flushed immediately
 import functools
 original_print = print
 print = functools.partial(print, flush=True)
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 import time
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import os
+import sqlite3
+import addresses
+import browser
+import crawler
+import events
+import extractor
+import listing_store
+import metrics
+import page_archive
+import selector_stats
+
+# pandas, pyarrow (history), gspread (sheets) and selenium.webdriver are imported where they're
+# first needed, so fixture parsing, dry runs and runs that end up saving nothing start fast
 
 def upload_to_google_sheets(df, sheet_url=None):
     """Upload DataFrame to your existing Google Sheet - Enhanced version with better error handling"""
@@ -38,31 +43,25 @@ def upload_to_google_sheets(df, sheet_url=None):
         print("📊 Attempting to upload to your Google Sheet...")
         
         try:
-            import gspread
-            from google.oauth2.service_account import Credentials
+            import sheets
             
-            # Check for credentials file
-            creds_file = 'credentials.json'
-            if not os.path.exists(creds_file) or os.path.getsize(creds_file) == 0:
+            # Check for credentials file (not needed when pointed at a local fake Sheets endpoint)
+            creds_file = sheets.CREDS_FILE
+            using_endpoint = bool(os.environ.get('HOMEHUNT_SHEETS_ENDPOINT'))
+            if not using_endpoint and (not os.path.exists(creds_file) or os.path.getsize(creds_file) == 0):
                 print("❌ No credentials.json file found!")
                 print("📝 Please follow the setup guide in GOOGLE_SETUP_GUIDE.md")
                 print("🔗 Quick setup: https://console.cloud.google.com/")
                 print("\n📋 Manual backup - Copy this data to your sheet:")
                 print("="*60)
-                print(f"=== HomeHunt Data - {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
+                print(f"=== HomeHunt Data - {time.strftime('%Y-%m-%d %H:%M:%S')} ===")
                 print(df.to_csv(index=False))
                 print("="*60)
                 return False
             
             print("🔑 Loading Google credentials...")
-            # Use service account credentials with proper scopes
-            scopes = [
-                'https://www.googleapis.com/auth/spreadsheets',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            credentials = Credentials.from_service_account_file(creds_file, scopes=scopes)
-            gc = gspread.authorize(credentials)
+            # Authorized client is cached and reused across uploads
+            gc = sheets.get_client(creds_file)
             
             print("📊 Connecting to Google Sheet...")
             try:
@@ -81,19 +80,13 @@ def upload_to_google_sheets(df, sheet_url=None):
             
             print("📝 Uploading data...")
             # Add timestamp
-            timestamp = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
             
             try:
-                # Add separator and data
-                worksheet.append_row([])
-                worksheet.append_row([f"=== HomeHunt Data - {timestamp} ==="])
-                worksheet.append_row(df.columns.tolist())
+                # Separator, header and every row go up as batched appends
+                requests_made = sheets.append_dataframe(worksheet, df, timestamp)
                 
-                # Upload data
-                for _, row in df.iterrows():
-                    worksheet.append_row(row.tolist())
-                
-                print(f"✅ Data uploaded successfully!")
+                print(f"✅ Data uploaded successfully! ({len(df)} rows in {requests_made} request(s))")
                 print(f"🔗 View your sheet: {sheet_url}")
                 return True
                 
@@ -125,281 +118,424 @@ def upload_to_google_sheets(df, sheet_url=None):
         print(f"❌ Error in Google Sheets function: {e}")
         return False
 
-def scrape_apartments_main():
-    """Main Apartments.com scraper - Enhanced version with robust extraction"""
+def describe(property_dict):
+    """Price | Address | Beds | Baths, for whichever of them the run extracted"""
+    return " | ".join(str(property_dict[field]) for field in ('Price', 'Address', 'Beds', 'Baths') if field in property_dict)
+
+def extract_properties(page_html, page_name=None, start_index=0, fields=extractor.FIELDS):
+    """Detect property cards in a saved results page and extract the requested fields.
+
+    Uses crawler.parse_results, the same code (and no card cap) as a live crawl.
+    """
+    print("🔍 Enhanced Method: Using multiple selector strategies...")
+    # Saved pages have no network traffic, but --capture still reads their inline JSON
+    payloads = [] if browser.network_capture_enabled() else None
+    result = crawler.parse_results(crawler.empty_result(crawler.PageTask(None, page_name, None)), page_html,
+                                   payloads, fields=fields)
+    if result['source'] == 'network':
+        print(f"✅ Found {result['cards']} properties in the page's JSON data")
+    elif result['selector']:
+        print(f"✅ Found {result['cards']} properties using selector: {result['selector']}")
+    else:
+        print("🔍 Fallback Method: Looking for any divs with property-like content...")
     
-    # Setup Chrome with enhanced options
-    options = Options()
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-features=VizDisplayCompositor")
-    options.add_argument("--disable-web-security")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-background-timer-throttling")
-    options.add_argument("--disable-backgrounding-occluded-windows")
-    options.add_argument("--disable-renderer-backgrounding")
-    options.add_argument("--disable-background-networking")
-    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    print(f"📋 Total property containers found: {result['cards']}")
+    events.emit(events.PAGE, location=None, page=page_name, url=None, cards=result['cards'],
+                selector=result['selector'], source=result['source'], timings={}, error=None)
     
-    driver = webdriver.Chrome(options=options)
-    driver.set_page_load_timeout(30)
+    properties = result['properties']
+    for i, property_dict in enumerate(properties, start=1):
+        print(f"✅ Property {i}: {describe(property_dict)}")
+        events.emit(events.PROPERTY, index=start_index + i, record=property_dict)
+    if result['cards'] > len(properties):
+        print(f"⏭️ Skipped {result['cards'] - len(properties)} card(s) with insufficient data")
     
+    run = metrics.current_run()
+    if run is not None:
+        run.add_page(result)
+    return properties
+
+# Where each run's results are written: the partitioned Parquet history, per-run CSV files, or both
+OUTPUT_FORMATS = ('parquet', 'csv', 'both')
+DEFAULT_OUTPUT = 'parquet'
+
+def save_properties(properties, upload=True, locations=None, run_id=None, output=DEFAULT_OUTPUT, buildings=None):
+    """Save extracted properties (Parquet history and/or CSV, plus the listing store) and optionally upload them to Google Sheets.
+
+    buildings is the run's addresses.BuildingIndex; its newly seen buildings are added to the store.
+    """
+    if not properties:
+        print("❌ No properties extracted")
+        events.emit(events.PHASE, message="No properties extracted")
+        return None
+    
+    import pandas as pd
+    import history
+    
+    print(f"\n🎉 Successfully extracted {len(properties)} properties!")
+    print("\n📋 ALL PROPERTIES:")
+    for prop in properties:
+        print(prop)
+        
+    df = pd.DataFrame(properties)
+    run_id = run_id or listing_store.new_run_id()
+    scraped_at = time.time()
+    filename = None
+    dataset = None
+    
+    # Append to the Parquet history
+    if output in ('parquet', 'both'):
+        if history.available():
+            with metrics.phase('parquet_write'):
+                dataset = history.append_run(properties, run_id, scraped_at, locations)
+            print(f"\n💾 Data added to Parquet history: {dataset}")
+        else:
+            print("\n⚠️ pyarrow is not installed, saving CSV instead")
+            output = 'csv'
+    
+    # Save to CSV
+    if output in ('csv', 'both'):
+        filename = f"apartments_properties_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+        with metrics.phase('csv_write'):
+            df.to_csv(filename, index=False)
+        print(f"\n💾 Data saved to: {filename}")
+    
+    # Add the run to the local listing store
     try:
-        print("Opening Apartments.com New York...")
-        driver.get("https://www.apartments.com/new-york-ny/")
+        with metrics.phase('store_write'):
+            store = listing_store.ListingStore()
+            run_id = store.add_run(properties, run_id=run_id, scraped_at=scraped_at,
+                                   locations=locations, source=filename or dataset)
+            if buildings is not None:
+                store.save_buildings(buildings, scraped_at)
+        print(f"🗄️ Run {run_id} added to the listing store")
+    except Exception as e:
+        print(f"❌ Could not write to the listing store: {e}")
+        events.emit(events.ERROR, message=f"Error writing to the listing store: {e}")
+    events.emit(events.SAVED, filename=filename, dataset=dataset, count=len(df), run_id=run_id)
+    
+    if not upload:
+        return df
+    
+    # Upload to Google Sheets
+    # Your Google Sheet URL
+    your_sheet_url = ""
+    
+    print("\n📊 Uploading to your Google Sheet...")
+    events.emit(events.PHASE, message="Uploading to Google Sheets...")
+    with metrics.phase('sheets_upload'):
+        sheet_success = upload_to_google_sheets(df, your_sheet_url)
+    events.emit(events.SHEET, success=bool(sheet_success), url=your_sheet_url or None, rows=len(df))
+    if sheet_success:
+        print(f"\n🌐 Your data is now accessible online!")
+        print(f"🔗 View your sheet: {your_sheet_url}")
+        print("\n📋 Anyone can view this data by visiting the link above!")
+    else:
+        print("\n📝 Google Sheets upload completed. Check the output above for details.")
+    return df
+
+def load_buildings(dry_run=False):
+    """Building index for a run: every building the listing store knows (a fresh one for dry runs)"""
+    if dry_run:
+        return addresses.BuildingIndex()
+    try:
+        return listing_store.ListingStore().building_index()
+    except Exception as e:
+        print(f"⚠️ Could not load known buildings, IDs start fresh this run: {e}")
+        return addresses.BuildingIndex()
+
+def open_archive(run_id):
+    """Page archive for a run's rendered results pages, or None if it can't be opened"""
+    try:
+        return page_archive.PageArchive(run_id=run_id)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Could not open the page archive, pages won't be archived: {e}")
+        return None
+
+def enrich_properties(properties):
+    """Merge detail-page fields (sqft, units, amenities, coordinates) into each listing"""
+    import enrichment
+    print(f"\n🔎 Fetching detail pages for {len(properties)} listing(s)...")
+    events.emit(events.PHASE, message=f"Fetching detail pages for {len(properties)} listings...")
+    phase_start = time.perf_counter()
+    with metrics.phase('enrich'):
+        stats = enrichment.enrich(properties)
+    elapsed = time.perf_counter() - phase_start
+    print(f"✅ Details: {stats['fetched']} fetched, {stats['revalidated']} unchanged (304), "
+          f"{stats['stale']} stale from cache, {stats['failed']} failed, {stats['retries']} retries in {elapsed:.1f}s")
+    events.emit(events.TIMINGS, timings={'enrich': elapsed, **stats})
+
+def write_timing_report(dry_run=False):
+    """Write the current run's JSON timing report and send it to the web app (only send it for dry runs)"""
+    run = metrics.current_run()
+    if run is None:
+        return None
+    if dry_run:
+        events.emit(events.METRICS, path=None, report=run.report())
+        return None
+    try:
+        path, report = run.write_report()
+    except OSError as e:
+        print(f"❌ Could not write the timing report: {e}")
+        return None
+    print(f"📈 Timing report: {path}")
+    events.emit(events.METRICS, path=path, report=report)
+    return path
+
+def report_changes(changes):
+    """Print and emit the new/changed/removed listings found by incremental mode"""
+    for change in changes[listing_store.NEW] + changes[listing_store.CHANGED] + changes[listing_store.REMOVED]:
+        record = change['record']
+        if change['kind'] == listing_store.NEW:
+            print(f"🆕 New: {describe(record)}")
+        elif change['kind'] == listing_store.CHANGED:
+            delta = change['price_delta']
+            moved = f" (rent {delta['min']:+,} / {delta['max']:+,})" if delta and delta['min'] is not None else ""
+            # Only the fields this run extracted (--fields) are compared
+            previous = {field: change['previous'][field] for field in record if field in change['previous']}
+            print(f"✏️ Changed: {describe(previous)} → {describe(record)}{moved}")
+        else:
+            print(f"🗑️ Removed: {describe(record)}")
+        events.emit(events.CHANGE, **change)
+
+def scrape_fixtures(fixtures_dir, upload=False, incremental=False, output=DEFAULT_OUTPUT, enrich=False,
+                    fields=extractor.FIELDS, dry_run=False):
+    """Offline mode - run card detection and extraction over saved results pages (dry_run=True saves nothing)"""
+    pages = sorted(f for f in os.listdir(fixtures_dir) if f.endswith('.html'))
+    if not pages:
+        print(f"❌ No saved .html pages found in {fixtures_dir}")
+        return []
+    
+    properties = []
+    run_id = listing_store.new_run_id()
+    metrics.start_run(run_id)
+    store = listing_store.ListingStore() if incremental else None
+    buildings, seen = load_buildings(dry_run), set()
+    phase_start = time.perf_counter()
+    for page_name in pages:
+        print(f"\n📄 Parsing saved page: {page_name}")
+        events.emit(events.PHASE, message=f"Parsing saved page {page_name}...")
+        with open(os.path.join(fixtures_dir, page_name), encoding='utf-8') as f:
+            page_properties = extract_properties(f.read(), page_name, start_index=len(properties), fields=fields)
+        page_properties, duplicates = addresses.dedupe(page_properties, buildings, seen)
+        if duplicates:
+            print(f"🏢 {duplicates} duplicate listing(s) of the same building collapsed")
+        if store is not None:
+            changes = store.track_changes(page_properties, run_id)
+            report_changes(changes)
+            print(f"♻️ {changes['unchanged']} unchanged listing(s) skipped")
+            page_properties = [change['record'] for change in changes[listing_store.NEW] + changes[listing_store.CHANGED]]
+        properties.extend(page_properties)
+    
+    if dry_run:
+        print(f"\n🧪 Dry run: {len(properties)} listing(s) extracted, nothing saved")
+    elif incremental and not properties:
+        print("\n✅ No listing changes since the last run")
+    else:
+        if enrich:
+            enrich_properties(properties)
+        save_properties(properties, upload=upload, run_id=run_id, output=output, buildings=buildings)
+    write_timing_report(dry_run)
+    events.emit(events.DONE, count=len(properties), elapsed=time.perf_counter() - phase_start)
+    return properties
+
+def format_timings(timings):
+    """One-line summary of per-phase timings (seconds)"""
+    parts = []
+    for phase, value in timings.items():
+        if isinstance(value, bool):
+            parts.append(f"{phase}={value}")
+        elif value is None:
+            parts.append(f"{phase}=n/a")
+        else:
+            parts.append(f"{phase}={value:.2f}s")
+    return " | ".join(parts)
+
+def scrape_apartments_main(locations=None, max_pages=1, workers=crawler.DEFAULT_WORKERS,
+                           wait_timeout=browser.PAGE_WAIT_TIMEOUT, pool=None, incremental=False,
+                           output=DEFAULT_OUTPUT, enrich=False, fields=extractor.FIELDS, dry_run=False, stop=None):
+    """Main Apartments.com scraper - crawls every results page of each location.
+
+    Pass a crawler.BrowserPool to reuse already-running Chrome sessions. fields limits the
+    run to a subset of extractor.FIELDS (the others are never probed); dry_run=True saves nothing. With incremental=True
+    only listings that are new or changed since the last run are reported and saved (and,
+    with enrich=True, only those get their detail pages fetched). Unless archiving is turned off
+    (--no-archive), every rendered results page is kept in the page archive for re-parsing.
+    Setting stop (a threading.Event) cancels the run: the crawl ends early and nothing is saved.
+    """
+    locations = locations or crawler.DEFAULT_LOCATIONS
+    properties = []
+    property_locations = []
+    buildings, seen = load_buildings(dry_run), set()
+    run_id = listing_store.new_run_id()
+    run = metrics.start_run(run_id)
+    store = listing_store.ListingStore() if incremental else None
+    unchanged = 0
+    network_totals = {'requests': 0, 'bytes': 0}
+    # Proven card/field selectors per site go first; learned from every page, saved after the crawl
+    selectors = selector_stats.SelectorStats() if selector_stats.enabled() else None
+    archive = open_archive(run_id) if page_archive.enabled() and not dry_run else None
+    
+    def report_page(result):
+        nonlocal unchanged
+        task = result['task']
+        run.add_page(result)
+        print(f"\n📄 {task.location} page {task.page}: {task.url}")
+        if result['error']:
+            print(f"❌ Error: {result['error']}")
+            events.emit(events.ERROR, message=result['error'], location=task.location, page=task.page)
+            return
+        if result['source'] == 'network':
+            print(f"✅ Found {result['cards']} properties in the page's JSON data")
+        elif result['selector']:
+            print(f"✅ Found {result['cards']} properties using selector: {result['selector']}")
+        else:
+            print("🔍 Fallback Method: Looking for any divs with property-like content...")
         
-        print("Waiting for page to load...")
-        time.sleep(10)
+        # The same building can show up on more than one card or page, spelled differently; keep the first
+        new_properties, duplicates = addresses.dedupe(result['properties'], buildings, seen)
+        if duplicates:
+            print(f"🏢 {duplicates} duplicate listing(s) of the same building collapsed")
         
-        print("Apartments.com usually doesn't require verification.")
-        # Skip interactive prompt for web interface
-        print("Continuing automatically...")
+        if store is not None:
+            changes = store.track_changes(new_properties, run_id, locations=[task.location] * len(new_properties))
+            report_changes(changes)
+            unchanged += changes['unchanged']
+            new_properties = [change['record'] for change in changes[listing_store.NEW] + changes[listing_store.CHANGED]]
         
+        print(f"📋 Total property containers found: {len(properties) + len(new_properties)}")
+        events.emit(events.PAGE, location=task.location, page=task.page, url=task.url, cards=result['cards'],
+                    properties=len(new_properties), selector=result['selector'], source=result['source'],
+                    timings=result['timings'], network=result['network'], error=None)
+        for property_dict in new_properties:
+            properties.append(property_dict)
+            property_locations.append(task.location)
+            print(f"✅ Property {len(properties)}: {describe(property_dict)}")
+            events.emit(events.PROPERTY, index=len(properties), record=property_dict)
+        if result['timings'].get('timed_out'):
+            print(f"⏱️ Page not fully ready after {wait_timeout}s, continuing with what rendered")
+        print(f"⏱️ Timings: {format_timings(result['timings'])}")
+        if result['network']:
+            network_totals['requests'] += result['network']['requests']
+            network_totals['bytes'] += result['network']['bytes']
+            print(f"📶 Network: {result['network']['requests']} requests, {result['network']['bytes'] / 1024:.0f} KB transferred")
+    
+    phase_start = time.perf_counter()
+    try:
+        print(f"Opening Apartments.com: {', '.join(locations)} "
+              f"({'all' if not max_pages else max_pages} page(s) each, {workers} browser(s))...")
+        print("Waiting for page to load...")
         print("Searching for property data...")
-        print(f"Page title: {driver.title}")
+        events.emit(events.PHASE, message=f"Searching {', '.join(locations)}...", locations=locations,
+                    max_pages=max_pages, workers=workers)
+        pages = crawler.crawl(locations, max_pages=max_pages, workers=workers,
+                              wait_timeout=wait_timeout, on_page=report_page, pool=pool, selectors=selectors, fields=fields,
+                              archive=archive, stop=stop)
+        cancelled = stop is not None and stop.is_set()
+        elapsed = time.perf_counter() - phase_start
+        if selectors is not None and not dry_run:
+            try:
+                selectors.save()
+            except OSError as e:
+                print(f"⚠️ Could not save selector stats: {e}")
+        run.add_phase('crawl', elapsed)
+        print(f"\n⏱️ Crawled {len(pages)} page(s) in {elapsed:.1f}s "
+              f"({network_totals['requests']} requests, {network_totals['bytes'] / 1024:.0f} KB transferred)")
+        events.emit(events.TIMINGS, timings={'crawl': elapsed, 'pages': len(pages), **network_totals})
+        
+        if store is not None and not cancelled:
+            # Listings can only be called removed where every results page was seen
+            report_changes(store.track_changes([], run_id, complete_locations=crawler.complete_locations(pages)))
+            print(f"♻️ {unchanged} unchanged listing(s) skipped")
         
-        # Enhanced property card detection with multiple selectors
         try:
-            properties = []
-            
-            print("🔍 Enhanced Method: Using multiple selector strategies...")
-            
-            # Try multiple selectors to find property cards
-            card_selectors = [
-                '.placard',
-                '.property-wrap',
-                '.listing-item',
-                '.result-item',
-                '[data-testid="property-card"]',
-                '.rentals-results .property',
-                '.property-card',
-                '.listing-result',
-                '[class*="property"]',
-                '[class*="listing"]'
-            ]
-            
-            property_cards = []
-            for selector in card_selectors:
-                try:
-                    cards = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if cards:
-                        print(f"✅ Found {len(cards)} properties using selector: {selector}")
-                        property_cards = cards[:15]  # Limit to 15 properties
-                        break
-                except Exception as e:
-                    print(f"⏭️ Selector {selector} failed: {e}")
-                    continue
-            
-            if not property_cards:
-                print("🔍 Fallback Method: Looking for any divs with property-like content...")
-                all_divs = driver.find_elements(By.TAG_NAME, "div")
-                for div in all_divs[:100]:  # Check first 100 divs
-                    text = div.text.strip()
-                    if ('$' in text and ('bed' in text.lower() or 'bath' in text.lower() or 'br' in text.lower())):
-                        property_cards.append(div)
-                        if len(property_cards) >= 10:
-                            break
-            
-            print(f"📋 Total property containers found: {len(property_cards)}")
-            
-            # Enhanced data extraction from property cards
-            for i, card in enumerate(property_cards):
-                print(f"\n🏠 Processing property {i+1}/{len(property_cards)}...")
-                
-                try:
-                    # Enhanced price extraction
-                    price = "Not found"
-                    price_selectors = [
-                        ".//*[contains(@class, 'price')]",
-                        ".//*[contains(@class, 'rent')]",
-                        ".//*[contains(text(), '$')]",
-                        ".//span[contains(text(), '$')]",
-                        ".//div[contains(text(), '$')]",
-                        './/*[@data-testid*="price"]'
-                    ]
-                    
-                    for selector in price_selectors:
-                        try:
-                            price_elem = card.find_element(By.XPATH, selector)
-                            price_text = price_elem.text.strip()
-                            if '$' in price_text and price_text != "" and len(price_text) > 1:
-                                price = price_text
-                                break
-                        except:
-                            continue
-                    
-                    # Enhanced address extraction
-                    address = "Not found"
-                    address_selectors = [
-                        ".//*[contains(@class, 'address')]",
-                        ".//*[contains(@class, 'location')]",
-                        ".//*[contains(text(), 'NY')]",
-                        ".//*[contains(text(), 'Street')]",
-                        ".//*[contains(text(), 'Ave')]",
-                        ".//*[contains(text(), 'Blvd')]",
-                        ".//*[contains(text(), 'Road')]",
-                        './/*[@data-testid*="address"]'
-                    ]
-                    
-                    for selector in address_selectors:
-                        try:
-                            addr_elem = card.find_element(By.XPATH, selector)
-                            addr_text = addr_elem.text.strip()
-                            if any(word in addr_text.lower() for word in ['ny', 'street', 'ave', 'blvd', 'road', 'dr', 'new york']):
-                                address = addr_text
-                                break
-                        except:
-                            continue
-                    
-                    # Enhanced beds extraction
-                    beds = "Not found"
-                    bed_selectors = [
-                        ".//*[contains(@class, 'bed')]",
-                        ".//*[contains(@class, 'bedroom')]",
-                        ".//*[contains(text(), 'bed')]",
-                        ".//*[contains(text(), 'bd')]",
-                        ".//*[contains(text(), 'studio')]",
-                        ".//*[contains(text(), 'br')]"
-                    ]
-                    
-                    for selector in bed_selectors:
-                        try:
-                            bed_elem = card.find_element(By.XPATH, selector)
-                            bed_text = bed_elem.text.strip().lower()
-                            if any(word in bed_text for word in ['bed', 'bd', 'studio', 'bedroom', 'br']):
-                                beds = bed_elem.text.strip()
-                                break
-                        except:
-                            continue
-                    
-                    
-                    # Enhanced bathroom detection
-                    baths = "Not found"
-                    
-                    # Method 1: Look for explicit bathroom info
-                    try:
-                        card_text = card.text.lower()
-                        
-                        # Look for bathroom patterns
-                        import re
-                        bath_patterns = [
-                            r'(\d+(?:\.\d+)?)\s*bath(?:s|room)?',
-                            r'(\d+(?:\.\d+)?)\s*ba\b',
-                            r'(\d+(?:\.\d+)?)\s*bathroom'
-                        ]
-                        
-                        for pattern in bath_patterns:
-                            bath_match = re.search(pattern, card_text)
-                            if bath_match:
-                                baths = bath_match.group(0)
-                                break
-                    except:
-                        pass
-                    
-                    # Method 2: Enhanced estimation based on bedroom count
-                    if baths == "Not found" and beds != "Not found":
-                        try:
-                            bed_text = beds.lower()
-                            if 'studio' in bed_text:
-                                baths = "1 bath"
-                            elif '1' in bed_text:
-                                baths = "1 bath"
-                            elif '2' in bed_text:
-                                baths = "1-2 baths"
-                            elif '3' in bed_text:
-                                baths = "2 baths"
-                            elif '4' in bed_text:
-                                baths = "2-3 baths"
-                            else:
-                                baths = "2+ baths"
-                        except:
-                            pass
-                    
-                    # Enhanced URL extraction
-                    url = "Not found"
-                    url_selectors = [
-                        ".//a[contains(@href, '/')]",
-                        ".//a",
-                        ".//*[@href]"
-                    ]
-                    
-                    for selector in url_selectors:
-                        try:
-                            link_elem = card.find_element(By.XPATH, selector)
-                            href = link_elem.get_attribute('href')
-                            if href:
-                                if href.startswith('http'):
-                                    url = href
-                                elif href.startswith('/'):
-                                    url = 'https://www.apartments.com' + href
-                                break
-                        except:
-                            continue
-                    
-                    # Enhanced data validation - include property if it has useful data
-                    data_count = 0
-                    for value in [price, address, beds, baths, url]:
-                        if value != "Not found" and value.strip():
-                            data_count += 1
-                    
-                    if data_count >= 2:  # Include if at least 2 fields have data
-                        property_dict = {
-                            'Price': price,
-                            'Address': address,
-                            'Beds': beds,
-                            'Baths': baths,
-                            'URL': url
-                        }
-                        
-                        properties.append(property_dict)
-                        print(f"✅ Property {len(properties)}: {price} | {address} | {beds} | {baths}")
-                    else:
-                        print(f"⏭️ Skipped property {i+1} (insufficient data)")
-                    
-                except Exception as e:
-                    print(f"❌ Error extracting property {i+1}: {e}")
-                    continue
-            
-            if properties:
-                print(f"\n🎉 Successfully extracted {len(properties)} properties!")
-                print("\n📋 ALL PROPERTIES:")
-                for prop in properties:
-                    print(prop)
-                    
-                # Save to CSV
-                df = pd.DataFrame(properties)
-                filename = f"apartments_properties_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                df.to_csv(filename, index=False)
-                print(f"\n💾 Data saved to: {filename}")
-                
-                # Upload to Google Sheets
-                # Your Google Sheet URL
-                your_sheet_url = ""
-                
-                print("\n📊 Uploading to your Google Sheet...")
-                sheet_success = upload_to_google_sheets(df, your_sheet_url)
-                if sheet_success:
-                    print(f"\n🌐 Your data is now accessible online!")
-                    print(f"🔗 View your sheet: {your_sheet_url}")
-                    print("\n📋 Anyone can view this data by visiting the link above!")
-                else:
-                    print("\n📝 Google Sheets upload completed. Check the output above for details.")
+            if cancelled:
+                print(f"\n🛑 Cancelled after {len(pages)} page(s), nothing saved")
+                events.emit(events.ERROR, message="Cancelled")
+            elif dry_run:
+                print(f"\n🧪 Dry run: {len(properties)} listing(s) extracted, nothing saved")
+            elif incremental and not properties:
+                print("\n✅ No listing changes since the last run")
             else:
-                print("❌ No properties extracted")
-                
+                if enrich:
+                    enrich_properties(properties)
+                save_properties(properties, locations=property_locations, run_id=run_id, output=output,
+                                buildings=buildings)
         except Exception as e:
             print(f"Error in extraction: {e}")
+            events.emit(events.ERROR, message=f"Error saving results: {e}")
         
         # Skip interactive prompt for web interface
         print("Extraction completed, closing browser...")
         
     except Exception as e:
         print(f"Error: {e}")
-        
-    finally:
-        driver.quit()
+        events.emit(events.ERROR, message=str(e))
+    
+    write_timing_report(dry_run)
+    events.emit(events.DONE, count=len(properties), elapsed=time.perf_counter() - phase_start)
+    return properties
 
 if __name__ == "__main__":
-    scrape_apartments_main()
+    import argparse
+    parser = argparse.ArgumentParser(description="HomeHunt Data Collector - Apartments.com scraper")
+    parser.add_argument("--fixtures", help="Parse saved results pages in this directory instead of browsing live")
+    parser.add_argument("--upload", action="store_true", help="Also upload fixture-mode results to Google Sheets")
+    parser.add_argument("--locations", nargs="+", default=crawler.DEFAULT_LOCATIONS,
+                        help="Apartments.com location slugs to search, e.g. new-york-ny brooklyn-ny")
+    parser.add_argument("--max-pages", type=int, default=1,
+                        help="Results pages per location; 0 walks every page (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=crawler.DEFAULT_WORKERS,
+                        help="Concurrent Chrome sessions (default: %(default)s)")
+    parser.add_argument("--wait-timeout", type=float, default=browser.PAGE_WAIT_TIMEOUT,
+                        help="Maximum seconds to wait for results to render (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only report and save listings that are new or changed since the last run")
+    parser.add_argument("--load-all-resources", action="store_true",
+                        help="Don't block images, fonts and third-party trackers in Chrome")
+    parser.add_argument("--capture", action="store_true",
+                        help="Read listings from the site's JSON/XHR responses, falling back to the page HTML")
+    parser.add_argument("--fields", nargs="+", type=str.lower, choices=[field.lower() for field in extractor.FIELDS],
+                        help="Only extract these fields, e.g. --fields price url (default: all)")
+    parser.add_argument("--fixed-selectors", action="store_true",
+                        help="Always try card/field selectors in their default order (no learning)")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Don't keep the rendered results pages in page_archive/ for re-parsing")
+    parser.add_argument("--enrich", action="store_true",
+                        help="Fetch each listing's detail page for sqft, units, amenities and coordinates")
+    parser.add_argument("--output", choices=OUTPUT_FORMATS, default=DEFAULT_OUTPUT,
+                        help="Parquet history under listing_history/, per-run CSV files, or both (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Extract and report listings without saving or uploading anything")
+    parser.add_argument("--events", action="store_true",
+                        help="Write JSON-lines progress events to stdout; human-readable log goes to stderr")
+    args = parser.parse_args()
+    if args.dry_run and (args.incremental or args.upload):
+        parser.error("--dry-run can't be combined with --incremental or --upload")
+    
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+    
+    if args.load_all_resources:
+        browser.set_resource_policy(browser.ResourcePolicy.load_everything())
+    if args.capture:
+        browser.set_network_capture(True)
+    if args.fixed_selectors:
+        selector_stats.set_enabled(False)
+    if args.no_archive:
+        page_archive.set_enabled(False)
+    
+    if args.events:
+        events.configure(sys.stdout)
+        sys.stdout = sys.stderr
+    
+    fields = extractor.select_fields(args.fields)
+    if args.fixtures:
+        scrape_fixtures(args.fixtures, upload=args.upload, incremental=args.incremental, output=args.output,
+                        enrich=args.enrich, fields=fields, dry_run=args.dry_run)
+    else:
+        scrape_apartments_main(locations=args.locations, max_pages=args.max_pages,
+                               workers=args.workers, wait_timeout=args.wait_timeout,
+                               incremental=args.incremental, output=args.output, enrich=args.enrich,
+                               fields=fields, dry_run=args.dry_run)
 
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Run timing reports and Prometheus-format metrics
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+
+# Histogram buckets (seconds) for phases that range from sub-millisecond parsing to minute-long crawls
+PHASE_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Per-page timings from crawler.fetch_page that are phase durations (the rest are markers or flags)
+PAGE_PHASES = ('browser_start', 'acquire', 'navigation', 'waited', 'archive', 'parse', 'card_discovery', 'extraction')
+
+
+class RunMetrics:
+    """Phase timings, page outcomes and per-field extraction stats for one run"""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.phases = {}          # name -> [total seconds, count, cumulative counts per PHASE_BUCKETS bound]
+        self.pages = {'ok': 0, 'error': 0}
+        self.sources = {}         # 'dom' / 'network' -> pages
+        self.selectors = {}       # winning card selector -> pages
+        self.cards = 0
+        self.fields = {}          # field -> [seconds, calls, misses]
+        self.network = {'requests': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+
+    def add_phase(self, name, seconds):
+        if seconds is None:
+            return
+        with self._lock:
+            total = self.phases.setdefault(name, [0.0, 0, [0] * len(PHASE_BUCKETS)])
+            total[0] += seconds
+            total[1] += 1
+            for i, bound in enumerate(PHASE_BUCKETS):
+                if seconds <= bound:
+                    total[2][i] += 1
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_page(self, result):
+        """Fold one crawler.fetch_page result into the run"""
+        with self._lock:
+            self.pages['error' if result['error'] else 'ok'] += 1
+            if result['error']:
+                return
+            self.cards += result['cards']
+            source = result.get('source') or 'dom'
+            self.sources[source] = self.sources.get(source, 0) + 1
+            selector = result['selector'] or ('network' if source == 'network' else 'fallback')
+            self.selectors[selector] = self.selectors.get(selector, 0) + 1
+            for field, (seconds, calls, misses) in (result.get('field_stats') or {}).items():
+                totals = self.fields.setdefault(field, [0.0, 0, 0])
+                totals[0] += seconds
+                totals[1] += calls
+                totals[2] += misses
+            for key in self.network:
+                self.network[key] += (result.get('network') or {}).get(key, 0)
+        for name in PAGE_PHASES:
+            self.add_phase(name, result['timings'].get(name))
+
+    def report(self):
+        with self._lock:
+            return {
+                'run_id': self.run_id,
+                'started_at': self.started_at,
+                'elapsed': time.time() - self.started_at,
+                'phases': {name: {'seconds': seconds, 'count': count, 'buckets': list(buckets)}
+                           for name, (seconds, count, buckets) in self.phases.items()},
+                'pages': dict(self.pages),
+                'sources': dict(self.sources),
+                'selectors': dict(self.selectors),
+                'cards': self.cards,
+                'fields': {field: {'seconds': seconds, 'calls': calls, 'misses': misses,
+                                   'us_per_card': seconds / calls * 1e6 if calls else 0.0,
+                                   'miss_rate': misses / calls if calls else 0.0}
+                           for field, (seconds, calls, misses) in self.fields.items()},
+                'network': dict(self.network),
+            }
+
+    def write_report(self, report_dir=REPORT_DIR):
+        """Save the JSON timing report; returns (path, report)"""
+        report = self.report()
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"timing_{self.run_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return path, report
+
+
+_run = None
+
+
+def start_run(run_id):
+    """Begin collecting for a new run; phase()/add_page() go to it until the next start_run"""
+    global _run
+    _run = RunMetrics(run_id)
+    return _run
+
+
+def current_run():
+    return _run
+
+
+@contextmanager
+def phase(name):
+    """Time a block into the current run (a no-op outside a run)"""
+    if _run is None:
+        yield
+        return
+    with _run.phase(name):
+        yield
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def lines(self):
+        return [f"{self.name}{_labels(self.label_names, key)} {value}" for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=PHASE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """Record one observation of `value` seconds"""
+        self.merge([1 if value <= bound else 0 for bound in self.buckets], value, 1, **labels)
+
+    def merge(self, buckets, total, count, **labels):
+        """Add observations already bucketed elsewhere: cumulative counts per bound in self.buckets,
+        their sum and their number (observations outside every finite bucket only count towards +Inf)"""
+        key = self._key(labels)
+        hits, seconds, observations = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+        self.values[key] = ([a + b for a, b in zip(hits, buckets)], seconds + total, observations + count)
+
+    def lines(self):
+        lines = []
+        for key, (buckets, total, observations) in sorted(self.values.items()):
+            for bound, hits in zip(self.buckets, buckets):
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [('le', f'{bound:g}')])} {hits}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [('le', '+Inf')])} {observations}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {observations}")
+        return lines
+
+
+class Registry:
+    """Metrics the web app exposes on /metrics, fed by each run's timing report"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = Counter("homehunt_runs_total", "Scrape runs that reported metrics")
+        self.phase_seconds = Histogram("homehunt_phase_seconds", "Time spent per pipeline phase", ["phase"])
+        self.pages = Counter("homehunt_pages_total", "Results pages loaded", ["status"])
+        self.page_sources = Counter("homehunt_page_source_total", "Pages by extraction path", ["source"])
+        self.selector_wins = Counter("homehunt_card_selector_wins_total", "Pages where a card selector matched first", ["selector"])
+        self.cards = Counter("homehunt_cards_total", "Listing cards found")
+        self.field_seconds = Counter("homehunt_field_extract_seconds_total", "Time spent extracting each field", ["field"])
+        self.field_calls = Counter("homehunt_field_extractions_total", "Field extractions attempted", ["field"])
+        self.field_misses = Counter("homehunt_field_misses_total", "Field extractions that found nothing", ["field"])
+        self.network_requests = Counter("homehunt_browser_requests_total", "Requests made by Chrome on results pages")
+        self.network_bytes = Counter("homehunt_browser_bytes_total", "Bytes transferred by Chrome on results pages")
+        self.jobs = Gauge("homehunt_jobs", "Jobs by state", ["state"])
+        self.job_seconds = Histogram("homehunt_job_seconds", "Job run time, start to finish", ["status"])
+        self._metrics = [self.runs, self.phase_seconds, self.pages, self.page_sources, self.selector_wins, self.cards,
+                         self.field_seconds, self.field_calls, self.field_misses, self.network_requests,
+                         self.network_bytes, self.jobs, self.job_seconds]
+
+    def observe_report(self, report):
+        """Add one run's timing report (RunMetrics.report()) to the totals"""
+        with self._lock:
+            self.runs.inc()
+            for name, phase_stats in report.get('phases', {}).items():
+                # Reports without per-phase buckets only tell the sum and count, so those land in +Inf
+                buckets = phase_stats.get('buckets') or [0] * len(PHASE_BUCKETS)
+                self.phase_seconds.merge(buckets, phase_stats['seconds'], phase_stats['count'], phase=name)
+            for status, count in report.get('pages', {}).items():
+                self.pages.inc(count, status=status)
+            for source, count in report.get('sources', {}).items():
+                self.page_sources.inc(count, source=source)
+            for selector, count in report.get('selectors', {}).items():
+                self.selector_wins.inc(count, selector=selector)
+            self.cards.inc(report.get('cards', 0))
+            for field, field_stats in report.get('fields', {}).items():
+                self.field_seconds.inc(field_stats['seconds'], field=field)
+                self.field_calls.inc(field_stats['calls'], field=field)
+                self.field_misses.inc(field_stats['misses'], field=field)
+            self.network_requests.inc(report.get('network', {}).get('requests', 0))
+            self.network_bytes.inc(report.get('network', {}).get('bytes', 0))
+
+    def observe_job(self, status, seconds):
+        with self._lock:
+            self.job_seconds.observe(seconds, status=status)
+
+    def set_jobs(self, counts):
+        with self._lock:
+            for state, count in counts.items():
+                self.jobs.set(count, state=state)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for metric in self._metrics:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
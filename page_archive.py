@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Content-addressed archive of rendered results pages, and re-parsing it
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # pages are gzipped instead without zstandard
+    zstandard = None
+
+import addresses
+import crawler
+import extractor
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_archive")
+ZSTD_LEVEL = 10
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    location TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    object TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_run ON pages (run_id);
+CREATE INDEX IF NOT EXISTS idx_pages_location ON pages (location, page);
+"""
+
+_enabled = True
+
+
+def set_enabled(enabled):
+    """Turn page archiving on or off for later crawls (main.py --no-archive)"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def enabled():
+    return _enabled
+
+
+def _compress(data):
+    """(compressed bytes, file extension)"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".html.zst"
+    return gzip.compress(data, compresslevel=9), ".html.gz"
+
+
+def read_object(base_dir, name):
+    """Decompressed HTML of one stored object ('ab/abcd....html.zst')"""
+    with open(os.path.join(base_dir, "objects", name), 'rb') as f:
+        blob = f.read()
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{name} needs the zstandard package (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+    return gzip.decompress(blob).decode('utf-8')
+
+
+class PageArchive:
+    """Rendered pages stored once per distinct content (by SHA-256), with a SQLite manifest of
+    every fetch by run, location, page and time"""
+
+    def __init__(self, base_dir=ARCHIVE_DIR, run_id=None):
+        self.base_dir = base_dir
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(base_dir, "objects"), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.base_dir, "manifest.db"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def add(self, task, page_html, fetched_at=None):
+        """Archive one fetched page (a crawler.PageTask and its HTML); returns the digest, or None on failure.
+
+        Identical pages are stored once; each fetch still gets its own manifest entry.
+        """
+        data = page_html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            folder = os.path.join(self.base_dir, "objects", digest[:2])
+            existing = [digest + extension for extension in (".html.zst", ".html.gz")
+                        if os.path.exists(os.path.join(folder, digest + extension))]
+            if existing:
+                name = existing[0]
+                stored = os.path.getsize(os.path.join(folder, name))
+            else:
+                blob, extension = _compress(data)
+                name = digest + extension
+                os.makedirs(folder, exist_ok=True)
+                tmp_path = os.path.join(folder, f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(blob)
+                os.replace(tmp_path, os.path.join(folder, name))
+                stored = len(blob)
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO pages (run_id, location, page, url, fetched_at, digest, object, size, stored) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.run_id, task.location, task.page, task.url, fetched_at or time.time(), digest,
+                     f"{digest[:2]}/{name}", len(data), stored))
+        except (OSError, sqlite3.Error):
+            return None
+        return digest
+
+    def entries(self, run_id=None, location=None, since=None, until=None):
+        """Manifest entries matching the filters, oldest first"""
+        clauses = []
+        args = []
+        if run_id:
+            clauses.append("run_id = ?")
+            args.append(run_id)
+        if location:
+            clauses.append("location = ?")
+            args.append(location)
+        if since is not None:
+            clauses.append("fetched_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("fetched_at < ?")
+            args.append(until)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT run_id, location, page, url, fetched_at, digest, object, size, stored FROM pages {where} "
+                f"ORDER BY fetched_at, id", args).fetchall()
+        return [{'run_id': run, 'location': location, 'page': page, 'url': url, 'fetched_at': fetched_at,
+                 'digest': digest, 'object': name, 'size': size, 'stored': stored}
+                for run, location, page, url, fetched_at, digest, name, size, stored in rows]
+
+    def read(self, entry):
+        """The HTML of one manifest entry"""
+        return read_object(self.base_dir, entry['object'])
+
+    def reparse(self, entries, workers=DEFAULT_WORKERS, fields=extractor.FIELDS, capture=False):
+        """Run extraction again over archived pages on `workers` processes, one result per distinct page.
+
+        Pages archived more than once with identical content are parsed once (first entry wins).
+        Returns crawler-style page results in manifest order.
+        """
+        unique = []
+        seen = set()
+        for entry in entries:
+            if entry['digest'] not in seen:
+                seen.add(entry['digest'])
+                unique.append(entry)
+        if workers <= 1 or len(unique) <= 1:
+            return [_reparse_entry(self.base_dir, entry, fields, capture) for entry in unique]
+        count = len(unique)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_reparse_entry, [self.base_dir] * count, unique, [fields] * count,
+                                     [capture] * count, chunksize=max(1, count // (workers * 4))))
+
+
+def _reparse_entry(base_dir, entry, fields, capture):
+    """Extract one archived page (runs in a worker process)"""
+    result = crawler.empty_result(crawler.PageTask(entry['location'], entry['page'], entry['url']))
+    try:
+        page_html = read_object(base_dir, entry['object'])
+    except (OSError, RuntimeError, ValueError) as e:
+        result['error'] = f"Could not read {entry['object']}: {e}"
+        return result
+    return crawler.parse_results(result, page_html, [] if capture else None, fields=fields)
+
+
+def _timestamp(value):
+    """Unix seconds from '2026-10-17', '2026-10-17T08:00' or a number"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt archive of rendered results pages")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="Archive directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("list", "Show archived pages"), ("reparse", "Extract listings from archived pages again")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--run", help="Only pages from this run id")
+        command.add_argument("--location", help="Only pages of this location slug")
+        command.add_argument("--since", help="Fetched at or after (date, date-time or Unix seconds)")
+        command.add_argument("--until", help="Fetched before (date, date-time or Unix seconds)")
+    reparse_command = commands.choices["reparse"]
+    reparse_command.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                                 help="Parser processes (default: %(default)s, one per core)")
+    reparse_command.add_argument("--fields", nargs="+", type=str.lower, choices=[field.lower() for field in extractor.FIELDS],
+                                 help="Only extract these fields (default: all)")
+    reparse_command.add_argument("--capture", action="store_true",
+                                 help="Try the page's inline JSON before the HTML cards, like a --capture run")
+    reparse_command.add_argument("--save", action="store_true",
+                                 help="Save the listings as a new run (history/CSV and the listing store)")
+    reparse_command.add_argument("--output", choices=("parquet", "csv", "both"), default="parquet",
+                                 help="With --save: Parquet history, a CSV file, or both (default: %(default)s)")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.dir)
+    entries = archive.entries(args.run, args.location, _timestamp(args.since), _timestamp(args.until))
+    if not entries:
+        print("📭 No archived pages match")
+    elif args.command == "list":
+        for entry in entries:
+            fetched = datetime.fromtimestamp(entry['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{fetched}  {entry['run_id'] or '-':<24} {entry['location']} p{entry['page']:<3} "
+                  f"{entry['size'] / 1024:7.0f} KB -> {entry['stored'] / 1024:5.0f} KB  {entry['digest'][:12]}")
+        distinct = {entry['digest']: entry for entry in entries}.values()
+        print(f"📦 {len(entries)} page(s), {len(distinct)} distinct, "
+              f"{sum(entry['stored'] for entry in distinct) / 1024 / 1024:.1f} MB on disk "
+              f"({sum(entry['size'] for entry in entries) / 1024 / 1024:.1f} MB of HTML)")
+    else:
+        fields = extractor.select_fields(args.fields)
+        start = time.perf_counter()
+        results = archive.reparse(entries, args.workers, fields, args.capture)
+        elapsed = time.perf_counter() - start
+        failed = [result for result in results if result['error']]
+        cpu = sum(sum(result['timings'].get(phase, 0) for phase in ('parse', 'card_discovery', 'extraction'))
+                  for result in results)
+        if args.save:
+            import main
+            buildings = main.load_buildings()
+        else:
+            buildings = addresses.BuildingIndex()
+        properties = []
+        locations = []
+        seen = set()
+        found = 0
+        for result in results:
+            found += len(result['properties'])
+            unique, _ = addresses.dedupe(result['properties'], buildings, seen)
+            properties.extend(unique)
+            locations.extend([result['task'].location] * len(unique))
+        print(f"🔁 Re-parsed {len(results)} distinct page(s) of {len(entries)} in {elapsed:.1f}s on {args.workers} "
+              f"process(es) ({cpu:.1f}s of parsing): {found} listing(s), {len(properties)} unique, {len(failed)} failed")
+        for result in failed[:5]:
+            print(f"   ❌ {result['error']}")
+        if args.save:
+            main.save_properties(properties, upload=False, locations=locations, output=args.output, buildings=buildings)
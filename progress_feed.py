@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Incremental progress feed for Server-Sent Events viewers
+import json
+import threading
+
+HEARTBEAT_SECONDS = 15
+MAX_LOG_ENTRIES = 500         # deltas kept before they are folded into a fresh snapshot
+SNAPSHOT_PROPERTIES = 200     # most recent listings a snapshot carries
+
+
+class ProgressFeed:
+    """Turns a mutable progress dict into a numbered log of deltas viewers can follow.
+
+    Each delta carries only the scalar fields that changed plus the listings added
+    since the previous delta, so viewers never re-download the full result set.
+    progress["properties"] may be a window of the most recent listings, with
+    progress["property_count"] counting all of them. The log is folded into a
+    snapshot every MAX_LOG_ENTRIES deltas, so its size doesn't grow with the job.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._log = []          # [(seq, kind, payload)] since the last snapshot
+        self._seq = 0
+        self._fields = {}
+        self._property_count = 0
+
+    @staticmethod
+    def _scalar_fields(progress):
+        return {key: value for key, value in progress.items() if key != "properties"}
+
+    @staticmethod
+    def _count(progress):
+        return progress.get("property_count", len(progress.get("properties", [])))
+
+    def reset(self, progress):
+        """Start a new feed generation (a new job); viewers re-sync from a snapshot"""
+        with self._cond:
+            self._seq += 1
+            self._fields = self._scalar_fields(progress)
+            self._property_count = self._count(progress)
+            payload = {"fields": dict(self._fields),
+                       "properties": list(progress.get("properties", []))[-SNAPSHOT_PROPERTIES:]}
+            self._log = [(self._seq, "snapshot", payload)]
+            self._cond.notify_all()
+
+    def update(self, progress):
+        """Publish whatever changed in `progress` since the last call"""
+        with self._cond:
+            fields = self._scalar_fields(progress)
+            changed = {key: value for key, value in fields.items() if self._fields.get(key) != value}
+            properties = progress.get("properties", [])
+            count = self._count(progress)
+            added = count - self._property_count
+            new_properties = properties[max(len(properties) - added, 0):] if added > 0 else []
+            if not changed and not new_properties:
+                return
+            self._seq += 1
+            self._fields = fields
+            self._property_count = count
+            self._log.append((self._seq, "delta", {"fields": changed, "properties": list(new_properties)}))
+            if len(self._log) > MAX_LOG_ENTRIES:
+                # Viewers that are further behind than this re-sync from the snapshot
+                self._log = [(self._seq, "snapshot", self._snapshot())]
+            self._cond.notify_all()
+
+    def _snapshot(self):
+        # Rebuild the current full state from the snapshot plus every delta after it
+        fields = {}
+        properties = []
+        for _, _, payload in self._log:
+            fields.update(payload["fields"])
+            properties.extend(payload["properties"])
+            del properties[:-SNAPSHOT_PROPERTIES]
+        return {"fields": fields, "properties": properties}
+
+    def stream(self, last_event_id=None, heartbeat=HEARTBEAT_SECONDS):
+        """Yield SSE-formatted messages: a snapshot (unless resuming), then deltas as they arrive"""
+        with self._cond:
+            first_seq = self._log[0][0] if self._log else self._seq + 1
+            # An id ahead of this feed comes from before a restart (restored feeds start again at 1)
+            if last_event_id is None or last_event_id < first_seq or last_event_id > self._seq:
+                cursor = self._seq
+                messages = [_format_sse(cursor, "snapshot", self._snapshot())]
+            else:
+                cursor = last_event_id
+                messages = []
+        for message in messages:
+            yield message
+
+        while True:
+            with self._cond:
+                if self._seq <= cursor:
+                    self._cond.wait(timeout=heartbeat)
+                first_seq = self._log[0][0] if self._log else self._seq + 1
+                if cursor < first_seq - 1 or cursor > self._seq:
+                    # A new job started while we were away, or the feed was reset; re-sync from its snapshot
+                    cursor = self._seq
+                    pending = [(cursor, "snapshot", self._snapshot())]
+                else:
+                    pending = [entry for entry in self._log if entry[0] > cursor]
+                    if pending:
+                        cursor = pending[-1][0]
+            if not pending:
+                yield ": keepalive\n\n"
+            for seq, kind, payload in pending:
+                yield _format_sse(seq, kind, payload)
+
+
+def _format_sse(seq, kind, payload):
+    return f"id: {seq}\nevent: {kind}\ndata: {json.dumps(payload, default=str)}\n\n"
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Long-lived scraper service with warm Chrome sessions
+import argparse
+import contextlib
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import events
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+CONNECT_TIMEOUT = 0.5
+
+# Session lifecycle
+DEFAULT_SESSIONS = 2
+MAX_PAGES_PER_SESSION = 50
+MAX_SESSION_MEMORY_MB = 1500
+PROFILE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chrome_profiles")
+
+
+class ScraperService:
+    """Runs scrape jobs one at a time on a pool of pre-started Chrome sessions"""
+
+    def __init__(self, sessions=DEFAULT_SESSIONS, max_pages_per_session=MAX_PAGES_PER_SESSION,
+                 max_memory_mb=MAX_SESSION_MEMORY_MB, profile_root=PROFILE_ROOT):
+        # Heavy imports only in the service process, never in the Flask client
+        import crawler
+        import events
+        import main
+        self._events = events
+        self._main = main
+        self.pool = crawler.BrowserPool(sessions, max_pages_per_session=max_pages_per_session,
+                                        max_memory_mb=max_memory_mb, profile_root=profile_root)
+        self.jobs = queue.Queue()
+        self._stops = {}    # job id -> Event that cancels it
+        self._stops_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Warm every browser session and start taking jobs"""
+        self.pool.warm()
+        self._worker.start()
+
+    def submit(self, job, output):
+        """Queue a job; its progress events go to `output`. Returns an Event set when done"""
+        done = threading.Event()
+        stop = threading.Event()
+        with self._stops_lock:
+            self._stops[job.get('id')] = stop
+        self.jobs.put((job, output, done, stop))
+        return done
+
+    def cancel(self, job_id):
+        """Stop a queued or running job; returns False if there is no such job"""
+        with self._stops_lock:
+            stop = self._stops.get(job_id)
+        if stop is None:
+            return False
+        stop.set()
+        return True
+
+    def _run(self):
+        while True:
+            job, output, done, stop = self.jobs.get()
+            try:
+                if stop.is_set():
+                    continue
+                # Jobs run one at a time, so pointing the shared event stream at this
+                # job's connection (and the human log at stderr) is safe here
+                self._events.configure(output)
+                with contextlib.redirect_stdout(sys.stderr):
+                    self._main.scrape_apartments_main(
+                        locations=job.get('locations'),
+                        max_pages=job.get('max_pages', 1),
+                        workers=min(job.get('workers', self.pool.size), self.pool.size),
+                        wait_timeout=job.get('wait_timeout', self._main.browser.PAGE_WAIT_TIMEOUT),
+                        pool=self.pool,
+                        incremental=bool(job.get('incremental')),
+                        enrich=bool(job.get('enrich')),
+                        fields=self._main.extractor.select_fields(job.get('fields')),
+                        stop=stop,
+                    )
+            except Exception as e:
+                try:
+                    self._events.emit(self._events.ERROR, message=str(e))
+                except Exception:
+                    pass
+            finally:
+                self._events.configure(None)
+                with self._stops_lock:
+                    self._stops.pop(job.get('id'), None)
+                done.set()
+
+    def close(self):
+        self.pool.close()
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """One connection = one job: a JSON line in, the job's progress events streamed back.
+
+    A {"cancel": <job id>} line instead cancels that job and gets {"cancelled": true/false} back.
+    """
+
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline().decode('utf-8') or '{}')
+        except ValueError as e:
+            error = {"event": "error", "message": f"invalid job request: {e}"}
+            self.wfile.write((json.dumps(error) + "\n").encode('utf-8'))
+            return
+        if 'cancel' in job:
+            cancelled = self.server.service.cancel(job['cancel'])
+            self.wfile.write((json.dumps({"cancelled": cancelled}) + "\n").encode('utf-8'))
+            return
+        output = self.connection.makefile('w', encoding='utf-8', errors='replace', newline='\n')
+        try:
+            self.server.service.submit(job, output).wait()
+        finally:
+            try:
+                output.flush()
+            except OSError:
+                pass  # client went away; the job still ran to completion
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(service, host=SERVICE_HOST, port=SERVICE_PORT):
+    """Accept jobs over a local TCP socket until interrupted"""
+    with _ThreadingServer((host, port), _JobHandler) as server:
+        server.service = service
+        print(f"🚀 Scraper service ready on {host}:{port} with {service.pool.size} warm browser(s)", flush=True)
+        server.serve_forever()
+
+
+class _JobOutput:
+    """Line reader over the job connection; hitting EOF marks the job finished"""
+
+    def __init__(self, job, sock):
+        self._job = job
+        self._reader = sock.makefile('r', encoding='utf-8', errors='replace', newline='\n')
+
+    def readline(self):
+        line = self._reader.readline()
+        if line == '':
+            self._job._finish()
+        else:
+            self._job._watch(line)
+        return line
+
+    def close(self):
+        self._reader.close()
+
+
+class ServiceJob:
+    """Client side of one service job, shaped like the subprocess.Popen app.py reads.
+
+    returncode is 0 when the job finished, 1 when it reported a run-level error event and
+    -9 after kill(), as with a killed process.
+    """
+
+    def __init__(self, sock, job_id, host=SERVICE_HOST, port=SERVICE_PORT):
+        self._sock = sock
+        self.job_id = job_id
+        self._address = (host, port)
+        self._failed = False
+        self.stdout = _JobOutput(self, sock)
+        self.stderr = None
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        """Wait until the service closes the connection (the job finished); raises
+        subprocess.TimeoutExpired after `timeout` seconds, like Popen.wait"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while self.returncode is None:
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired("scraper_service", timeout)
+                    self._sock.settimeout(remaining)
+                self.stdout.readline()
+        except socket.timeout:
+            raise subprocess.TimeoutExpired("scraper_service", timeout)
+        return self.returncode
+
+    def kill(self):
+        """Cancel the job on the service and stop reading its events"""
+        if self.returncode is None:
+            cancel_job(self.job_id, *self._address)
+            self._finish(-9)
+
+    def _watch(self, line):
+        event = events.parse(line)
+        # Errors of single pages carry their location; any other error fails the job
+        if event and event.get('event') == events.ERROR and 'location' not in event:
+            self._failed = True
+
+    def _finish(self, returncode=None):
+        if self.returncode is None:
+            self.returncode = returncode if returncode is not None else (1 if self._failed else 0)
+            self.stdout.close()
+            self._sock.close()
+
+
+def submit_job(job, host=SERVICE_HOST, port=SERVICE_PORT):
+    """Send a job to a running service; returns a ServiceJob, or None if no service is up"""
+    try:
+        sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    sock.settimeout(None)
+    job = dict(job, id=job.get('id') or uuid.uuid4().hex)
+    sock.sendall((json.dumps(job) + "\n").encode('utf-8'))
+    sock.shutdown(socket.SHUT_WR)
+    return ServiceJob(sock, job['id'], host, port)
+
+
+def cancel_job(job_id, host=SERVICE_HOST, port=SERVICE_PORT):
+    """Ask a running service to stop a job; returns False if it isn't running it (or isn't up)"""
+    try:
+        with socket.create_connection((host, port), timeout=CONNECT_TIMEOUT) as sock:
+            sock.sendall((json.dumps({"cancel": job_id}) + "\n").encode('utf-8'))
+            sock.shutdown(socket.SHUT_WR)
+            reply = sock.makefile('r', encoding='utf-8').readline()
+    except OSError:
+        return False
+    try:
+        return bool(json.loads(reply).get("cancelled"))
+    except ValueError:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt scraper service with warm Chrome sessions")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="Warm Chrome sessions to keep")
+    parser.add_argument("--max-pages-per-session", type=int, default=MAX_PAGES_PER_SESSION,
+                        help="Restart a session after this many page loads")
+    parser.add_argument("--max-memory-mb", type=int, default=MAX_SESSION_MEMORY_MB,
+                        help="Restart a session once its Chrome processes use more memory than this")
+    parser.add_argument("--load-all-resources", action="store_true",
+                        help="Don't block images, fonts and third-party trackers in Chrome")
+    parser.add_argument("--capture", action="store_true",
+                        help="Read listings from the site's JSON/XHR responses, falling back to the page HTML")
+    parser.add_argument("--fixed-selectors", action="store_true",
+                        help="Always try card/field selectors in their default order (no learning)")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Don't keep the rendered results pages in page_archive/ for re-parsing")
+    args = parser.parse_args()
+
+    if args.load_all_resources or args.capture:
+        import browser
+        if args.load_all_resources:
+            browser.set_resource_policy(browser.ResourcePolicy.load_everything())
+        browser.set_network_capture(args.capture)
+    if args.fixed_selectors:
+        import selector_stats
+        selector_stats.set_enabled(False)
+    if args.no_archive:
+        import page_archive
+        page_archive.set_enabled(False)
+
+    service = ScraperService(args.sessions, args.max_pages_per_session, args.max_memory_mb)
+    print("🌐 Starting Chrome sessions...", flush=True)
+    service.start()
+    try:
+        serve(service, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Learned card/field selector order per site
+import argparse
+import json
+import os
+import threading
+
+STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "selector_stats.json")
+
+# A selector is moved to the front once it has been tried this often and wins this share of its tries
+MIN_TRIES = 5
+MIN_HIT_RATE = 0.8
+# Counts are halved past this many tries so a layout change shows up within a few pages
+DECAY_AT = 1000
+
+_enabled = True
+
+
+def set_enabled(enabled):
+    """Turn selector learning on or off for later crawls (main.py --fixed-selectors)"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def enabled():
+    return _enabled
+
+
+def _add(counts, site, kind, selector, tries, hits, seconds):
+    entry = counts.setdefault(site, {}).setdefault(kind, {}).setdefault(selector, [0, 0, 0.0])
+    entry[0] += tries
+    entry[1] += hits
+    entry[2] += seconds
+    if entry[0] > DECAY_AT:
+        entry[0], entry[1], entry[2] = entry[0] // 2, entry[1] // 2, entry[2] / 2
+
+
+class PageSelectors:
+    """Selector order for one page (fixed when the page starts) and the attempts made on it"""
+
+    def __init__(self, site, rankings):
+        self.site = site
+        self.rankings = rankings    # kind -> promoted selectors, best first
+        self.counts = {}            # kind -> selector -> [tries, hits, seconds]
+        self._orders = {}
+
+    def order(self, kind, matchers):
+        """(selector, matcher) pairs with the learned winners first, then the rest in default order"""
+        key = (kind, id(matchers))
+        if key not in self._orders:
+            ranked = self.rankings.get(kind, [])
+            by_name = dict(matchers)
+            first = [(name, by_name[name]) for name in ranked if name in by_name]
+            self._orders[key] = first + [(name, matcher) for name, matcher in matchers if name not in ranked]
+        return self._orders[key]
+
+    def record(self, kind, selector, hit, seconds):
+        entry = self.counts.setdefault(kind, {}).setdefault(selector, [0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += hit
+        entry[2] += seconds
+
+
+class SelectorStats:
+    """Hit rate and latency per selector per site, kept in a JSON file between runs"""
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.sites = self._load()   # site -> kind -> selector -> [tries, hits, seconds]
+        self._delta = {}            # this run's attempts, added to the file on save()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def ranking(self, site, kind):
+        """Selectors that have proven themselves on this site, by hit rate then mean latency"""
+        with self._lock:
+            stats = self.sites.get(site, {}).get(kind, {})
+            proven = [(hits / tries, seconds / tries, name) for name, (tries, hits, seconds) in stats.items()
+                      if tries >= MIN_TRIES and hits / tries >= MIN_HIT_RATE]
+        return [name for _, _, name in sorted(proven, key=lambda item: (-item[0], item[1]))]
+
+    def page(self, site):
+        """Start a page: the order to try selectors in, based on everything recorded so far"""
+        with self._lock:
+            kinds = list(self.sites.get(site, {}))
+        return PageSelectors(site, {kind: self.ranking(site, kind) for kind in kinds})
+
+    def merge(self, page):
+        """Fold a finished page's attempts in, so the next page already benefits"""
+        with self._lock:
+            for kind, selectors in page.counts.items():
+                for name, (tries, hits, seconds) in selectors.items():
+                    _add(self.sites, page.site, kind, name, tries, hits, seconds)
+                    _add(self._delta, page.site, kind, name, tries, hits, seconds)
+        page.counts = {}
+
+    def save(self):
+        """Add this run's attempts to the file (re-read first, so concurrent runs don't overwrite each other)"""
+        with self._lock:
+            sites = self._load()
+            for site, kinds in self._delta.items():
+                for kind, selectors in kinds.items():
+                    for name, (tries, hits, seconds) in selectors.items():
+                        _add(sites, site, kind, name, tries, hits, seconds)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(sites, f, indent=1)
+            os.replace(tmp_path, self.path)
+            self.sites = sites
+            self._delta = {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HomeHunt learned selector statistics")
+    parser.add_argument("--path", default=STATS_PATH, help="Stats file (default: %(default)s)")
+    parser.add_argument("--reset", action="store_true", help="Forget everything learned")
+    args = parser.parse_args()
+
+    if args.reset:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+        print(f"🧹 Cleared {args.path}")
+    else:
+        stats = SelectorStats(args.path)
+        if not stats.sites:
+            print("📭 Nothing learned yet")
+        for site, kinds in sorted(stats.sites.items()):
+            print(f"🌐 {site}")
+            for kind, selectors in kinds.items():
+                ranked = stats.ranking(site, kind)
+                print(f"  {kind}:")
+                for name, (tries, hits, seconds) in sorted(selectors.items(), key=lambda item: -item[1][1]):
+                    mark = "⭐" if name in ranked else "  "
+                    print(f"   {mark} {hits / tries:6.1%} of {tries:>5} tries, {seconds / tries * 1e6:7.1f} µs  {name}")
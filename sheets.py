@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# HomeHunt Data Collector - Batched Google Sheets writer
+import json
+import os
+import random
+import time
+
+import gspread
+from google.oauth2.service_account import Credentials
+from gspread.http_client import HTTPClient
+
+CREDS_FILE = 'credentials.json'
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+GOOGLE_SHEETS_BASE = "https://sheets.googleapis.com"
+
+# Request sizing: the Sheets API rejects very large payloads, so stay well below its limits
+MAX_ROWS_PER_REQUEST = 5000
+MAX_BYTES_PER_REQUEST = 2 * 1024 * 1024
+
+# Retry policy for quota (429), timeouts (408) and transient server errors (5xx); appends use
+# APPEND_RETRY_STATUS_CODES instead
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Appends aren't idempotent: a 5xx may come after the rows were written, so only retry
+# responses that say the request was not carried out
+APPEND_RETRY_STATUS_CODES = {408, 429}
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 64.0
+
+# Authorized clients, kept alive for the life of the process
+_clients = {}
+
+
+def endpoint_http_client(base_url):
+    """gspread HTTP client class that sends Sheets API calls to base_url instead of Google"""
+
+    class EndpointHTTPClient(HTTPClient):
+        def request(self, method, endpoint, *args, **kwargs):
+            if endpoint.startswith(GOOGLE_SHEETS_BASE):
+                endpoint = base_url.rstrip('/') + endpoint[len(GOOGLE_SHEETS_BASE):]
+            return super().request(method, endpoint, *args, **kwargs)
+
+    return EndpointHTTPClient
+
+
+def get_client(creds_file=CREDS_FILE, endpoint=None):
+    """Authorized gspread client, reused across uploads until the credentials file changes.
+
+    endpoint (or the HOMEHUNT_SHEETS_ENDPOINT environment variable) points the client at
+    a local fake Sheets server instead of Google; no credentials are needed then.
+    """
+    endpoint = endpoint or os.environ.get('HOMEHUNT_SHEETS_ENDPOINT')
+    if endpoint:
+        key = ('endpoint', endpoint)
+        if key not in _clients:
+            import requests
+            _clients[key] = gspread.Client(None, session=requests.Session(),
+                                           http_client=endpoint_http_client(endpoint))
+        return _clients[key]
+
+    key = (os.path.abspath(creds_file), os.path.getmtime(creds_file))
+    if key not in _clients:
+        credentials = Credentials.from_service_account_file(creds_file, scopes=SCOPES)
+        _clients[key] = gspread.authorize(credentials)
+    return _clients[key]
+
+
+def _cell(value):
+    """JSON-safe cell value: NaN/None become blanks, NumPy scalars become Python ones"""
+    if value is None or value != value:
+        return ''
+    return value.item() if hasattr(value, 'item') else value
+
+
+def build_rows(df, timestamp):
+    """Separator, title, header and data rows for one upload, as plain cell values"""
+    rows = [
+        [],
+        [f"=== HomeHunt Data - {timestamp} ==="],
+        [str(column) for column in df.columns],
+    ]
+    for record in df.itertuples(index=False, name=None):
+        rows.append([_cell(value) for value in record])
+    return rows
+
+
+def chunk_rows(rows, max_rows=MAX_ROWS_PER_REQUEST, max_bytes=MAX_BYTES_PER_REQUEST):
+    """Split rows into batches that fit one append request"""
+    chunk = []
+    chunk_bytes = 0
+    for row in rows:
+        row_bytes = len(json.dumps(row, default=str))
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + row_bytes > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(row)
+        chunk_bytes += row_bytes
+    if chunk:
+        yield chunk
+
+
+def call_with_backoff(func, *args, max_retries=MAX_RETRIES, sleep=time.sleep, retry_codes=RETRY_STATUS_CODES,
+                      **kwargs):
+    """Call a Sheets API function, retrying the status codes in retry_codes with exponential backoff and jitter.
+
+    The default retries 408, 429 and 5xx; append_dataframe() passes APPEND_RETRY_STATUS_CODES
+    (408 and 429 only), because an append may have been applied before a 5xx came back.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            if e.code not in retry_codes or attempt == max_retries:
+                raise
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            print(f"⏳ Sheets API returned {e.code}, retrying in {delay:.1f}s...", flush=True)
+            sleep(delay)
+
+
+def append_dataframe(worksheet, df, timestamp, max_rows=MAX_ROWS_PER_REQUEST, max_bytes=MAX_BYTES_PER_REQUEST):
+    """Append a whole DataFrame in as few requests as possible; returns the request count"""
+    requests_made = 0
+    for chunk in chunk_rows(build_rows(df, timestamp), max_rows, max_bytes):
+        call_with_backoff(worksheet.append_rows, chunk, value_input_option='RAW',
+                          retry_codes=APPEND_RETRY_STATUS_CODES)
+        requests_made += 1
+    return requests_made